@@ -1,21 +1,154 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import (IS_POPUP_VAR, ORDER_VAR,
+                                             PAGE_VAR, TO_FIELD_VAR)
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
-from .models import Group, Post
+from . import moderation
+from .models import Comment, Follow, Group, Post
 
+FULL_TEXT_CONFIG = 'russian'
+# Параметры списка, которые не сужают выборку.
+UNFILTERED_PARAMS = {PAGE_VAR, ORDER_VAR, IS_POPUP_VAR, TO_FIELD_VAR}
 
-class PostAdmin(admin.ModelAdmin):
+
+class EstimatedCountPaginator(Paginator):
+    """Паджинатор, не считающий COUNT(*) по большой таблице целиком.
+
+    Для списка без фильтров и поиска (estimate=True) в PostgreSQL берет
+    оценку числа строк из статистики планировщика, в остальных случаях
+    считает точно. Оценка включает удаленные и архивные строки.
+    """
+    estimate_threshold = 10000
+
+    def __init__(self, *args, estimate=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if self.estimate and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.estimate_threshold:
+                return int(row[0])
+        return super().count
+
+
+class FastModelAdmin(admin.ModelAdmin):
+    """Общие настройки списков для больших таблиц."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+    full_text_field = None
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            estimate=set(request.GET) <= UNFILTERED_PARAMS
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Полнотекстовый поиск по индексу вместо LIKE в PostgreSQL."""
+        connection = connections[queryset.db]
+        if (not search_term or not self.full_text_field
+                or connection.vendor != 'postgresql'):
+            return super().get_search_results(
+                request, queryset, search_term)
+        column = f'{queryset.model._meta.db_table}.{self.full_text_field}'
+        return queryset.extra(
+            where=[
+                f"to_tsvector('{FULL_TEXT_CONFIG}', {column}) "
+                f"@@ plainto_tsquery('{FULL_TEXT_CONFIG}', %s)"
+            ],
+            params=[search_term]
+        ), False
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа'
+    )
+
+
+class PostAdmin(FastModelAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
+    list_select_related = ("author", "group")
     search_fields = ("text",)
+    full_text_field = "text"
     list_filter = ("pub_date",)
-    empty_value_display = "-пусто-"
+    raw_id_fields = ("author",)
+    action_form = PostActionForm
+    actions = ("delete_posts", "regroup_posts", "ban_authors")
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def run_action(self, request, message, operation, *args):
+        batches = []
+        result = operation(*args, progress=batches.append)
+        self.message_user(
+            request, f"{message}: {result} (пакетов: {len(batches)})")
+
+    def delete_posts(self, request, queryset):
+        self.run_action(
+            request, "Удалено постов", moderation.delete_posts, queryset)
+    delete_posts.short_description = "Удалить выбранные посты"
+
+    def regroup_posts(self, request, queryset):
+        group_id = request.POST.get("group")
+        group = Group.objects.get(pk=group_id) if group_id else None
+        self.run_action(
+            request, "Перенесено постов",
+            moderation.regroup_posts, queryset, group)
+    regroup_posts.short_description = "Перенести в выбранную группу"
+
+    def ban_authors(self, request, queryset):
+        self.run_action(
+            request, "Заблокировано авторов, их посты удалены",
+            moderation.ban_authors, queryset)
+    ban_authors.short_description = "Заблокировать авторов и удалить посты"
 
 
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ("title", "slug", "description")
+    list_display = (
+        "title", "slug", "description", "posts_count", "last_post_date")
     search_fields = ("title",)
     empty_value_display = "-пусто-"
     prepopulated_fields = {"slug": ("title",)}
+    readonly_fields = ("posts_count", "authors_count", "last_post_date")
+
+
+class CommentAdmin(FastModelAdmin):
+    list_display = ("pk", "text", "created", "author", "post")
+    list_select_related = ("author", "post")
+    search_fields = ("text",)
+    full_text_field = "text"
+    raw_id_fields = ("author", "post")
+
+
+class FollowAdmin(FastModelAdmin):
+    list_display = ("pk", "user", "author")
+    list_select_related = ("user", "author")
+    search_fields = ("=user__username", "=author__username")
+    raw_id_fields = ("user", "author")
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
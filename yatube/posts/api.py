@@ -0,0 +1,201 @@
+"""
+JSON API только для чтения: ленты, пост и комментарии.
+
+Ответы собираются из строк .values() без создания моделей. Страницы
+листаются по курсору (дата, id) вместо OFFSET, поля выбираются
+параметром fields, а автор и группа раскрываются параметром expand.
+"""
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .models import Comment, Group, Post, User
+from .settings import PAGE_SIZE
+
+MAX_LIMIT = 100
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'image', 'author', 'group')
+COMMENT_FIELDS = ('id', 'text', 'created', 'author', 'post')
+EXPANSIONS = {
+    'author': {
+        'id': 'author_id',
+        'username': 'author__username',
+        'first_name': 'author__first_name',
+        'last_name': 'author__last_name',
+    },
+    'group': {
+        'id': 'group_id',
+        'slug': 'group__slug',
+        'title': 'group__title',
+    },
+}
+
+
+class BadRequest(Exception):
+    status = 400
+
+
+class NotAuthenticated(BadRequest):
+    status = 401
+
+
+def requested(request, name, allowed, default):
+    value = request.GET.get(name)
+    if not value:
+        return default
+    names = tuple(value.split(','))
+    unknown = set(names) - set(allowed)
+    if unknown:
+        raise BadRequest(f'Неизвестные значения {name}: {sorted(unknown)}')
+    return names
+
+
+def encode_cursor(moment, pk):
+    return f'{moment.isoformat()}_{pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        moment, pk = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(moment), int(pk)
+    except ValueError:
+        raise BadRequest('Некорректный курсор')
+
+
+def serialize_value(name, value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if name == 'image':
+        return settings.MEDIA_URL + value if value else None
+    return value
+
+
+def keyset_page(request, queryset, fields, date_field):
+    """Страница строк queryset и курсор следующей страницы."""
+    expand = requested(request, 'expand', EXPANSIONS, ())
+    try:
+        limit = min(int(request.GET.get('limit', PAGE_SIZE)), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest('Некорректный limit')
+    if limit < 1:
+        raise BadRequest('limit должен быть не меньше 1')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        moment, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': moment})
+            | Q(**{date_field: moment, 'pk__lt': pk})
+        )
+    queryset = queryset.order_by(f'-{date_field}', '-pk')
+    rows = list(queryset.values(*columns(fields, expand, date_field))[
+        :limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'results': [serialize(row, fields, expand) for row in rows],
+        'next': encode_cursor(rows[-1][date_field], rows[-1]['id'])
+        if more else None,
+    }
+
+
+def columns(fields, expand, date_field):
+    """Колонки для .values(): выбранные поля и раскрытые связи."""
+    names = {'id', date_field}
+    for field in fields:
+        if field in expand:
+            names.update(EXPANSIONS[field].values())
+        elif field in ('author', 'group', 'post'):
+            names.add(f'{field}_id')
+        else:
+            names.add(field)
+    return names
+
+
+def serialize(row, fields, expand):
+    result = {}
+    for field in fields:
+        if field in expand:
+            result[field] = {
+                name: row[column]
+                for name, column in EXPANSIONS[field].items()
+            } if row[f'{field}_id'] is not None else None
+        elif field in ('author', 'group', 'post'):
+            result[field] = row[f'{field}_id']
+        else:
+            result[field] = serialize_value(field, row[field])
+    return result
+
+
+def api_view(allowed_fields, date_field):
+    """Оборачивает представление, возвращающее queryset, в JSON-ответ."""
+    def decorator(view):
+        @require_GET
+        def wrapper(request, *args, **kwargs):
+            try:
+                queryset = view(request, *args, **kwargs)
+                fields = requested(
+                    request, 'fields', allowed_fields, allowed_fields)
+                return JsonResponse(
+                    keyset_page(request, queryset, fields, date_field),
+                    json_dumps_params={'ensure_ascii': False}
+                )
+            except BadRequest as error:
+                return JsonResponse(
+                    {'error': str(error)}, status=error.status)
+            except Http404:
+                return JsonResponse({'error': 'Не найдено'}, status=404)
+        return wrapper
+    return decorator
+
+
+@api_view(POST_FIELDS, 'pub_date')
+def posts(request):
+    return Post.objects.hot()
+
+
+@api_view(POST_FIELDS, 'pub_date')
+def group_posts(request, slug):
+    return Post.objects.hot().filter(
+        group=get_object_or_404(Group, slug=slug))
+
+
+@api_view(POST_FIELDS, 'pub_date')
+def profile_posts(request, username):
+    return Post.objects.filter(
+        author=get_object_or_404(User, username=username))
+
+
+@api_view(POST_FIELDS, 'pub_date')
+def follow_posts(request):
+    if not request.user.is_authenticated:
+        raise NotAuthenticated('Требуется вход')
+    return Post.objects.hot().filter(
+        author__following__user=request.user.pk)
+
+
+@api_view(COMMENT_FIELDS, 'created')
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('pub_date'), id=post_id)
+    return Comment.objects.filter(post=post_id, created__gte=post.pub_date)
+
+
+@require_GET
+def post_detail(request, post_id):
+    try:
+        fields = requested(request, 'fields', POST_FIELDS, POST_FIELDS)
+        expand = requested(request, 'expand', EXPANSIONS, ())
+    except BadRequest as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    row = Post.objects.filter(id=post_id).values(
+        *columns(fields, expand, 'pub_date')).first()
+    if row is None:
+        return JsonResponse({'error': 'Не найдено'}, status=404)
+    return JsonResponse(
+        serialize(row, fields, expand),
+        json_dumps_params={'ensure_ascii': False}
+    )
@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from users.identity import get_identity
+
+from .events import events_url
+from .notifications import unread_count
+
+
+def notifications(request):
+    return {'unread_notifications': SimpleLazyObject(
+        lambda: unread_count(get_identity(request).pk))}
+
+
+def events(request):
+    return {'post_events_url': events_url()}
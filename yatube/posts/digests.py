@@ -0,0 +1,107 @@
+"""
+Дайджесты лучших постов избранных авторов.
+
+Пользователи перебираются пачками по первичному ключу. На пачку
+приходится два запроса: подписки всех пользователей пачки и посты
+всех их авторов за период с числом комментариев, а дальше каждый
+дайджест собирается из этих наборов в памяти. Письма отправляются
+через одно соединение почтового бэкенда на весь прогон.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Follow, Post, User
+
+PERIODS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+SUBJECTS = {
+    'daily': 'Yatube: лучшее за день',
+    'weekly': 'Yatube: лучшее за неделю',
+}
+TEMPLATE = 'email/digest.txt'
+DIGEST_SIZE = 5
+
+
+def user_chunks(chunk_size):
+    """Получатели пачками, без загрузки всей таблицы пользователей."""
+    last_id = 0
+    while True:
+        chunk = list(
+            User.objects.filter(id__gt=last_id, is_active=True)
+            .exclude(email='')
+            .order_by('id')
+            .values('id', 'username', 'email')[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+def top_posts(user_ids, since, size=DIGEST_SIZE):
+    """Лучшие посты избранных авторов для каждого пользователя пачки."""
+    authors = defaultdict(set)
+    for user, author in Follow.objects.filter(
+        user__in=user_ids
+    ).values_list('user', 'author'):
+        authors[user].add(author)
+    posts = Post.objects.filter(
+        author__in=set().union(*authors.values()),
+        pub_date__gte=since
+    ).annotate(
+        comments_count=Count(
+            'comments', filter=Q(comments__deleted_at__isnull=True))
+    ).order_by(
+        '-comments_count', '-pub_date'
+    ).values(
+        'id', 'text', 'pub_date', 'author', 'author__username',
+        'comments_count'
+    )
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post['author']].append(post)
+    digests = {}
+    for user, followed in authors.items():
+        candidates = sorted(
+            (post for author in followed for post in by_author[author][:size]),
+            key=lambda post: (post['comments_count'], post['pub_date']),
+            reverse=True
+        )
+        if candidates:
+            digests[user] = candidates[:size]
+    return digests
+
+
+def send_digests(period='daily', chunk_size=500, now=None):
+    """Рассылает дайджесты всем пользователям, возвращает число писем."""
+    since = (now or timezone.now()) - PERIODS[period]
+    template = get_template(TEMPLATE)
+    sent = 0
+    with get_connection() as connection:
+        for chunk in user_chunks(chunk_size):
+            digests = top_posts([user['id'] for user in chunk], since)
+            messages = [
+                EmailMessage(
+                    SUBJECTS[period],
+                    template.render({
+                        'user': user,
+                        'posts': digests[user['id']],
+                        'site_url': settings.SITE_URL,
+                    }),
+                    to=[user['email']],
+                    connection=connection
+                )
+                for user in chunk if user['id'] in digests
+            ]
+            if messages:
+                sent += connection.send_messages(messages) or 0
+    return sent
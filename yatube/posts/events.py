@@ -0,0 +1,83 @@
+"""
+Server-Sent Events о новых постах для открытых страниц ленты.
+
+Клиент держит одно долгоживущее соединение вместо периодического
+обновления страницы. Соединение закрывается через SSE_MAX_SECONDS,
+браузер переподключается сам и продолжает с Last-Event-ID.
+
+В WSGI каждое соединение занимает поток воркера, поэтому поток
+событий выключен по умолчанию (SSE_ENABLED). Включать его стоит
+вместе с отдельным процессом для /events/ с асинхронными воркерами
+и общим брокером (см. pubsub.DatabaseBroker).
+"""
+
+import json
+import time
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from .models import Follow
+from .pubsub import get_broker
+
+HEARTBEAT_SECONDS = 15
+
+
+def followed_authors(request):
+    if not request.user.is_authenticated:
+        return set()
+    return set(Follow.objects.filter(
+        user=request.user.pk).values_list('author', flat=True))
+
+
+def event_stream(broker, last_id, authors=None):
+    deadline = time.monotonic() + settings.SSE_MAX_SECONDS
+    yield 'retry: 5000\n\n'
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events = broker.wait(last_id, min(HEARTBEAT_SECONDS, remaining))
+        if not events:
+            yield ': ping\n\n'
+            continue
+        for event_id, event in events:
+            last_id = event_id
+            if authors is not None and event['author_id'] not in authors:
+                continue
+            event = dict(event, url=reverse(
+                'post', args=[event['author'], event['id']]))
+            yield (
+                f'id: {event_id}\nevent: post\n'
+                f'data: {json.dumps(event, ensure_ascii=False)}\n\n'
+            )
+
+
+def events_url():
+    """Адрес потока событий для шаблонов или None, если он выключен."""
+    if not settings.SSE_ENABLED:
+        return None
+    return reverse('post_events')
+
+
+@require_GET
+def post_events(request):
+    if not settings.SSE_ENABLED:
+        raise Http404('Поток событий выключен')
+    broker = get_broker()
+    try:
+        last_id = int(request.META.get('HTTP_LAST_EVENT_ID'))
+    except (TypeError, ValueError):
+        last_id = broker.last_id
+    authors = None
+    if request.GET.get('feed') == 'follow':
+        authors = followed_authors(request)
+    response = StreamingHttpResponse(
+        event_stream(broker, last_id, authors),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
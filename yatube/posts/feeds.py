@@ -0,0 +1,156 @@
+"""
+Ленты RSS и Atom: общая, по группе и по автору.
+
+Каждая лента — не больше FEED_SIZE последних постов. ETag строится
+по базе: из id постов ленты и id их последних правок, которые читаются
+одним запросом по индексу pub_date. Новый, удаленный, перенесенный
+или отредактированный пост меняет ETag в любом воркере. Готовый ответ
+кэшируется по ETag, поэтому повторный опрос без изменений стоит одного
+запроса и возвращает 304.
+"""
+
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .models import Group, Post, PostRevision, User
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+
+
+def feed_etag(feed, request, **kwargs):
+    """ETag ленты по ее постам и их последним правкам."""
+    if not hasattr(request, 'feed_etag'):
+        last_revision = PostRevision.objects.filter(
+            post=OuterRef('pk')).order_by('-pk').values('pk')[:1]
+        state = list(feed.changes(**kwargs).order_by(
+            '-pub_date', '-pk'
+        ).annotate(
+            revision=Subquery(last_revision)
+        ).values_list('pk', 'revision')[:FEED_SIZE])
+        request.feed_etag = hashlib.md5(
+            f'{request.path}:{state}'.encode()).hexdigest()
+    return request.feed_etag
+
+
+def cached_feed(feed):
+    """Представление ленты с кэшем ответа и условным GET."""
+    def etag(request, *args, **kwargs):
+        return feed_etag(feed, request, **kwargs)
+
+    @condition(etag_func=etag)
+    def view(request, *args, **kwargs):
+        key = f'feeds:{etag(request, *args, **kwargs)}'
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, *args, **kwargs)
+            cache.set(key, response, FEED_CACHE_TIMEOUT)
+        return response
+    return view
+
+
+class PostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов Yatube'
+
+    def link(self, obj=None):
+        return reverse('index')
+
+    def posts(self, obj):
+        return Post.objects.hot()
+
+    def changes(self):
+        """Посты ленты для ETag, без загрузки группы или автора."""
+        return Post.objects.hot()
+
+    def items(self, obj=None):
+        return self.posts(obj).select_related('author')[:FEED_SIZE]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('post', args=[item.author.username, item.id])
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('group_posts', args=[obj.slug])
+
+    def posts(self, obj):
+        return obj.posts.hot()
+
+    def changes(self, slug):
+        return Post.objects.hot().filter(group__slug=slug)
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи @{obj.username}'
+
+    def description(self, obj):
+        return f'Новые записи автора @{obj.username}'
+
+    def link(self, obj):
+        return reverse('profile', args=[obj.username])
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+    def changes(self, username):
+        return Post.objects.filter(author__username=username)
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class PostsAtomFeed(AtomMixin, PostsFeed):
+    pass
+
+
+class GroupAtomFeed(AtomMixin, GroupFeed):
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorAtomFeed(AtomMixin, AuthorFeed):
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+posts_rss = cached_feed(PostsFeed())
+posts_atom = cached_feed(PostsAtomFeed())
+group_rss = cached_feed(GroupFeed())
+group_atom = cached_feed(GroupAtomFeed())
+author_rss = cached_feed(AuthorFeed())
+author_atom = cached_feed(AuthorAtomFeed())
@@ -0,0 +1,72 @@
+"""
+Лайки постов.
+
+Уникальность лайка пользователя гарантирует ограничение unique_like,
+а число лайков хранится в LIKE_SHARDS строках LikeCounter на пост:
+каждый лайк меняет случайную строку, поэтому лайки популярного поста
+не выстраиваются в очередь за блокировкой одной строки. Число лайков
+поста — сумма его строк, для ленты она считается подзапросом
+likes_count() в запросе самой страницы.
+"""
+
+import random
+
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Exists, F, IntegerField,
+                              OuterRef, Subquery, Sum, Value)
+from django.db.models.functions import Coalesce
+
+from .models import Like, LikeCounter
+
+LIKE_SHARDS = 8
+
+
+def likes_count(ref='pk'):
+    """Аннотация с числом лайков поста."""
+    totals = LikeCounter.objects.filter(
+        post=OuterRef(ref)
+    ).order_by().values('post').annotate(total=Sum('count')).values('total')
+    return Coalesce(Subquery(totals, output_field=IntegerField()), 0)
+
+
+def liked(user, ref='pk'):
+    """Аннотация с признаком лайка пользователя."""
+    if not user.is_authenticated:
+        return Value(False, output_field=BooleanField())
+    return Exists(Like.objects.filter(user=user.pk, post=OuterRef(ref)))
+
+
+def like_counts(post_ids):
+    """Число лайков для набора постов одним запросом."""
+    return dict(LikeCounter.objects.filter(
+        post__in=post_ids
+    ).order_by().values('post').annotate(
+        total=Sum('count')
+    ).values_list('post', 'total'))
+
+
+def add_like(post_id, delta):
+    shard = random.randrange(LIKE_SHARDS)
+    counter = LikeCounter.objects.filter(post=post_id, shard=shard)
+    if not counter.update(count=F('count') + delta):
+        LikeCounter.objects.bulk_create(
+            [LikeCounter(post_id=post_id, shard=shard)],
+            ignore_conflicts=True
+        )
+        counter.update(count=F('count') + delta)
+
+
+def toggle_like(user, post_id):
+    """Ставит или снимает лайк, возвращает True, если лайк поставлен."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post_id).delete()
+        if deleted:
+            add_like(post_id, -1)
+            return False
+        try:
+            with transaction.atomic():
+                Like.objects.create(user=user, post_id=post_id)
+        except IntegrityError:
+            return True
+        add_like(post_id, 1)
+        return True
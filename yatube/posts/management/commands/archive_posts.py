@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import moderation
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводит старые посты в архив и удаляет записи, '
+        'мягко удаленные из интерфейса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POST_ARCHIVE_DAYS)
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=settings.DELETED_RETENTION_DAYS
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=moderation.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        archived = moderation.archive_posts(
+            now - timedelta(days=options['days']),
+            progress=lambda count: self.stdout.write(
+                f'В архиве постов: {count}'),
+            chunk_size=options['chunk_size']
+        )
+        posts, comments = moderation.purge_deleted(
+            now - timedelta(days=options['retention_days']),
+            chunk_size=options['chunk_size']
+        )
+        self.stdout.write(
+            f'Архивировано постов: {archived}, удалено постов: {posts}, '
+            f'комментариев: {comments}'
+        )
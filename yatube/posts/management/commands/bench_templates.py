@@ -0,0 +1,88 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import Context, Engine, engines
+from django.test import override_settings
+
+from posts.models import Group, Post, User
+from users.identity import Identity
+
+# Отдельный кэш в памяти процесса: бенчмарк очищает его перед каждым
+# рендером и не должен трогать общий кэш со счетчиками лимитов,
+# сессиями и закэшированными лентами.
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-templates',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендера шаблона ленты движками Django '
+        '(с кэшем шаблонов и без него) и Jinja2.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', default='index.html')
+        parser.add_argument(
+            '--cards', type=int, nargs='+', default=[10, 50, 100])
+        parser.add_argument('--iterations', type=int, default=100)
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=BENCH_CACHES):
+            self.bench(options)
+
+    def bench(self, options):
+        django_engine = engines['django'].engine
+        uncached = Engine(
+            dirs=django_engine.dirs,
+            loaders=[
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+            libraries=django_engine.libraries,
+        )
+        renderers = {
+            'Django': lambda name, context: django_engine.get_template(
+                name).render(Context(context)),
+            'Django без кэша': lambda name, context: uncached.get_template(
+                name).render(Context(context)),
+            'Jinja2': lambda name, context: engines['jinja2'].get_template(
+                name).render(context),
+        }
+        for cards in options['cards']:
+            context = self.feed_context(cards)
+            for title, render in renderers.items():
+                elapsed = self.measure(
+                    render, options['template'], context,
+                    options['iterations'])
+                self.stdout.write(
+                    f'{options["template"]}, {cards} карточек, {title}: '
+                    f'{elapsed * 1000:.2f} мс, '
+                    f'{1 / elapsed:.0f} рендеров/с'
+                )
+
+    def measure(self, render, name, context, iterations):
+        render(name, context)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            cache.clear()
+            render(name, context)
+        return (time.perf_counter() - started) / iterations
+
+    def feed_context(self, cards):
+        author = User(id=1, username='bench')
+        group = Group(id=1, title='Группа', slug='bench')
+        posts = [
+            Post(id=index, text=f'Пост {index}', author=author, group=group)
+            for index in range(1, cards + 1)
+        ]
+        return {
+            'page': Paginator(posts, cards).get_page(1),
+            'group': group,
+            'viewer': Identity(),
+        }
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import partitions
+
+
+class Command(BaseCommand):
+    help = 'Создает секции комментариев на ближайшие месяцы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=partitions.MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        created = partitions.ensure_partitions(options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'Создана секция: {name}')
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import notifications, write_behind
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает отложенные комментарии и подписки в базу '
+        'и доставляет уведомления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Повторять сброс каждые N секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = write_behind.flush(options['batch_size'])
+            if flushed:
+                self.stdout.write(f'Сброшено операций: {flushed}')
+            delivered = notifications.deliver_pending(options['batch_size'])
+            if delivered:
+                self.stdout.write(f'Доставлено событий: {delivered}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
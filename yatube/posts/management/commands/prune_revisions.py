@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import revisions
+from posts.moderation import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Удаляет старые версии постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.REVISION_RETENTION_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        pruned = revisions.prune(
+            timezone.now() - timedelta(days=options['days']),
+            options['chunk_size']
+        )
+        self.stdout.write(f'Удалено версий: {pruned}')
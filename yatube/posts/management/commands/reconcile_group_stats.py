@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import stats
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счетчики групп с постами и исправляет расхождения.'
+
+    def handle(self, *args, **options):
+        fixed = stats.reconcile()
+        self.stdout.write(f'Исправлено групп: {fixed}')
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = 'Применяет затухание очков и пересобирает популярное.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Повторять пересчет каждые N секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            trending.refresh()
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
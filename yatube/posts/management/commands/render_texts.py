@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from posts import markup
+from posts.mentions import index_mentions
+from posts.models import Comment, Post
+from posts.moderation import CHUNK_SIZE, id_chunks
+
+LABELS = {Post: 'постов', Comment: 'комментариев'}
+
+
+def live(instances):
+    """Записи, не удаленные мягко (вместе с постом для комментариев).
+
+    Упоминания удаленных записей снимаются при удалении и не должны
+    появляться снова.
+    """
+    deleted_posts = set(Post.all_objects.filter(
+        pk__in={
+            instance.post_id for instance in instances
+            if isinstance(instance, Comment)
+        },
+        deleted_at__isnull=False
+    ).values_list('pk', flat=True))
+    return [
+        instance for instance in instances
+        if instance.deleted_at is None
+        and getattr(instance, 'post_id', None) not in deleted_posts
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет HTML и упоминания постов и комментариев, '
+        'сохраненных без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать HTML всех записей, а не только пустой.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            queryset = model.all_objects.all()
+            if not options['all']:
+                queryset = queryset.filter(text_html='')
+            rendered = 0
+            for chunk in id_chunks(queryset, options['chunk_size']):
+                instances = markup.render_html(list(
+                    model.all_objects.filter(pk__in=chunk)))
+                model.all_objects.bulk_update(instances, ['text_html'])
+                index_mentions(live(instances), replace=True)
+                rendered += len(instances)
+            self.stdout.write(f'Обработано {LABELS[model]}: {rendered}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts import digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает дайджесты лучших постов избранных авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            choices=sorted(digests.PERIODS),
+            default='daily'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        sent = digests.send_digests(
+            options['period'], options['chunk_size'])
+        self.stdout.write(f'Отправлено писем: {sent}')
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from yatube.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Загружает все шаблоны в кэш.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names = warm_templates()
+        self.stdout.write(
+            f'Загружено шаблонов: {len(names)} '
+            f'за {(time.perf_counter() - started) * 1000:.1f} мс'
+        )
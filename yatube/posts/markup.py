@@ -0,0 +1,84 @@
+"""
+Разметка текстов постов и комментариев.
+
+Текст сначала экранируется целиком, а затем в нем размечаются
+**жирный**, *курсив*, `код`, ссылки [текст](https://...), упоминания
+@username и группы #slug, поэтому в HTML попадают только теги,
+созданные здесь. HTML считается один раз при сохранении и хранится
+в поле text_html; упоминания и группы проверяются двумя запросами
+на всю пачку текстов, а при показе текст уже не разбирается.
+"""
+
+import re
+
+from django.urls import reverse
+from django.utils.html import escape
+
+from .models import Group, User
+
+MENTION = r'(?<![\w@])@(?P<mention>[\w+-]+(?:\.[\w+-]+)*)'
+GROUP = r'(?<![\w#&])#(?P<group>[-\w]+)'
+MARKUP = re.compile('|'.join((
+    r'`(?P<code>[^`\n]+)`',
+    r'\[(?P<label>[^\]\n]+)\]\((?P<url>https?://[^\s)]+)\)',
+    MENTION,
+    GROUP,
+    r'\*\*(?P<strong>[^\n]+?)\*\*',
+    r'\*(?P<em>[^*\n]+)\*',
+)))
+
+
+def mentions(text):
+    """Имена пользователей, упомянутых в тексте."""
+    return {match.group('mention') for match in re.finditer(MENTION, text)}
+
+
+def group_slugs(text):
+    return {match.group('group') for match in re.finditer(GROUP, text)}
+
+
+def render(text, usernames=(), slugs=()):
+    """HTML текста; ссылками становятся только usernames и slugs."""
+    def replace(match):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'code':
+            return f'<code>{value}</code>'
+        if kind == 'url':
+            return (
+                f'<a href="{value}" rel="nofollow noopener">'
+                f'{markup(match.group("label"))}</a>'
+            )
+        if kind == 'mention':
+            if value not in usernames:
+                return match.group(0)
+            url = reverse('profile', args=[value])
+            return f'<a href="{url}">@{value}</a>'
+        if kind == 'group':
+            if value not in slugs:
+                return match.group(0)
+            url = reverse('group_posts', args=[value])
+            return f'<a href="{url}">#{value}</a>'
+        return f'<{kind}>{markup(value)}</{kind}>'
+
+    def markup(escaped):
+        return MARKUP.sub(replace, escaped)
+
+    return markup(escape(text)).replace('\n', '<br>')
+
+
+def render_html(instances):
+    """Заполняет text_html у пачки постов или комментариев.
+
+    Упомянутые пользователи и группы ищутся по всей пачке сразу.
+    """
+    texts = [escape(instance.text) for instance in instances]
+    usernames = set(User.objects.filter(
+        username__in=set().union(*map(mentions, texts))
+    ).values_list('username', flat=True))
+    slugs = set(Group.objects.filter(
+        slug__in=set().union(*map(group_slugs, texts))
+    ).values_list('slug', flat=True))
+    for instance in instances:
+        instance.text_html = render(instance.text, usernames, slugs)
+    return instances
@@ -0,0 +1,49 @@
+"""
+Индекс упоминаний @username.
+
+Упоминания разбираются при сохранении поста или комментария тем же
+разбором, что и разметка (markup.mentions), и пишутся в Mention:
+одна строка на упомянутого пользователя и запись. Пользователи всей
+пачки ищутся одним запросом. Лента упоминаний читает Mention по
+индексу (user, -created, -id) с курсором вместо LIKE по текстам.
+"""
+
+from django.db import transaction
+
+from .markup import mentions
+from .models import Comment, Mention, Post, User
+
+
+def index_mentions(instances, replace=False):
+    """Записывает упоминания пачки постов или комментариев.
+
+    С replace=True прежние упоминания этих записей удаляются (правка).
+    """
+    if not instances:
+        return
+    found = [(instance, mentions(instance.text)) for instance in instances]
+    users = dict(User.objects.filter(
+        username__in=set().union(*(usernames for _, usernames in found))
+    ).values_list('username', 'id'))
+    rows = []
+    for instance, usernames in found:
+        for username in usernames:
+            user = users.get(username)
+            if user is None or user == instance.author_id:
+                continue
+            if isinstance(instance, Comment):
+                rows.append(Mention(
+                    user_id=user, author_id=instance.author_id,
+                    post_id=instance.post_id, comment_id=instance.pk,
+                    created=instance.created))
+            else:
+                rows.append(Mention(
+                    user_id=user, author_id=instance.author_id,
+                    post_id=instance.pk, created=instance.pub_date))
+    with transaction.atomic():
+        ids = [instance.pk for instance in instances]
+        if replace and isinstance(instances[0], Post):
+            Mention.objects.filter(post__in=ids, comment=None).delete()
+        elif replace:
+            Mention.objects.filter(comment__in=ids).delete()
+        Mention.objects.bulk_create(rows)
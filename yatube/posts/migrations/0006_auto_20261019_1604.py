@@ -0,0 +1,45 @@
+# Generated by Django 2.2.6 on 2026-10-19 16:04
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    rows = Post.objects.exclude(group=None).order_by().values(
+        'group').annotate(
+            posts=Count('id'),
+            authors=Count('author', distinct=True),
+            last=Max('pub_date'))
+    for row in rows:
+        Group.objects.filter(pk=row['group']).update(
+            posts_count=row['posts'],
+            authors_count=row['authors'],
+            last_post_date=row['last'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_auto_20210618_1520'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='authors_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество авторов'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='last_post_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Дата последней записи'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Количество записей'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
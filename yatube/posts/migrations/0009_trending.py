@@ -0,0 +1,45 @@
+# Generated by Django 2.2.6 on 2026-10-19 16:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='trend_score',
+            field=models.FloatField(db_index=True, default=0, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='trend_score',
+            field=models.FloatField(db_index=True, default=0, verbose_name='Популярность'),
+        ),
+        migrations.CreateModel(
+            name='Trend',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('group', 'Группа')], max_length=16, verbose_name='Тип')),
+                ('rank', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Популярность')),
+                ('refreshed', models.DateTimeField(verbose_name='Дата пересчета')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Group')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post')),
+            ],
+            options={
+                'verbose_name': 'Популярное',
+                'verbose_name_plural': 'Популярное',
+                'ordering': ('kind', 'rank'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trend',
+            index=models.Index(fields=['kind', 'rank'], name='posts_trend_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,129 @@
+from datetime import date
+
+from django.db import migrations
+
+# Замороженная копия posts.partitions на момент миграции: дальнейшие
+# правки модуля не должны менять то, что делает миграция.
+TABLE = 'posts_comment'
+MONTHS_AHEAD = 3
+MIN_VERSION = 110000
+OLD_TABLE = f'{TABLE}_old'
+INDEXES = (
+    ('posts_comment_post_id_idx', 'btree (post_id)'),
+    ('posts_comment_author_id_idx', 'btree (author_id)'),
+    ('posts_comment_text_fts', "gin (to_tsvector('russian', text))"),
+)
+FOREIGN_KEYS = (
+    ('posts_comment_post_id_fk', 'post_id', 'posts_post'),
+    ('posts_comment_author_id_fk', 'author_id', 'auth_user'),
+)
+
+
+def supported(connection):
+    return (
+        connection.vendor == 'postgresql'
+        and connection.pg_version >= MIN_VERSION
+    )
+
+
+def is_partitioned(cursor, table=TABLE):
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE relname = %s", [table])
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start, end):
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def create_partition(cursor, month, table=TABLE):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS '
+        f'{table}_y{month.year}m{month.month:02d} '
+        f'PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)',
+        [month.isoformat(), add_months(month, 1).isoformat()]
+    )
+
+
+def rebuild(schema_editor, partitioned):
+    """Пересоздает posts_comment секционированной или обычной таблицей.
+
+    Строки копируются одним INSERT ... SELECT, последовательность id
+    переходит к новой таблице. Первичный ключ, индексы и внешние ключи
+    создаются после удаления старой таблицы, чтобы не конфликтовать
+    с ней по именам. На время копирования таблица заблокирована,
+    поэтому на больших базах миграцию запускают в окно обслуживания.
+    """
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_get_serial_sequence(%s, %s)', [TABLE, 'id'])
+        sequence, = cursor.fetchone()
+        cursor.execute(f'SELECT MIN(created)::date FROM {TABLE}')
+        first, = cursor.fetchone()
+    execute(f'ALTER SEQUENCE {sequence} OWNED BY NONE')
+    execute(f'ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}')
+    if partitioned:
+        execute(
+            f'CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (created)')
+        execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+        today = date.today()
+        with schema_editor.connection.cursor() as cursor:
+            for month in month_range(
+                    first or today, add_months(today, MONTHS_AHEAD)):
+                create_partition(cursor, month)
+    else:
+        execute(
+            f'CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS)')
+    execute(f'INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}')
+    execute(f'DROP TABLE {OLD_TABLE}')
+    execute(
+        f'ALTER TABLE {TABLE} ADD PRIMARY KEY '
+        f'({"id, created" if partitioned else "id"})')
+    execute(f'ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id')
+    for name, definition in INDEXES:
+        execute(f'CREATE INDEX {name} ON {TABLE} USING {definition}')
+    for name, column, target in FOREIGN_KEYS:
+        execute(
+            f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} '
+            f'FOREIGN KEY ({column}) REFERENCES {target} (id) '
+            f'DEFERRABLE INITIALLY DEFERRED')
+
+
+def partition_comments(apps, schema_editor):
+    if not supported(schema_editor.connection):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            return
+    rebuild(schema_editor, partitioned=True)
+
+
+def unpartition_comments(apps, schema_editor):
+    if not supported(schema_editor.connection):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return
+    rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_soft_delete_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_comments, unpartition_comments),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.6 on 2026-10-19 16:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_partition_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('diff', models.TextField(verbose_name='Обратный дифф текста')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Картинка версии')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата правки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Версия поста',
+                'verbose_name_plural': 'Версии постов',
+                'ordering': ('-created', '-id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postrevision',
+            index=models.Index(fields=['post', '-created'], name='posts_revision_history_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.6 on 2026-10-19 16:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_mentions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(verbose_name='Вес')),
+                ('grouped', models.BooleanField(default=True, verbose_name='Учитывать в группе')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Событие популярности',
+                'verbose_name_plural': 'События популярности',
+            },
+        ),
+    ]
@@ -4,12 +4,30 @@ from django.db import models
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def hot(self):
+        """Посты для лент: без архивных, по частичному индексу."""
+        return self.filter(archived=False)
+
+
+class LiveManager(models.Manager):
+    """Менеджер без удаленных пользователями записей."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Post(models.Model):
     text = models.TextField(
         default='Ваш текст',
         verbose_name='Текст',
         help_text='Введите текст поста'
     )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст в HTML'
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации',
@@ -36,12 +54,41 @@ class Post(models.Model):
         null=True,
         help_text='Загрузите картинку'
     )
+    trend_score = models.FloatField(
+        default=0,
+        verbose_name='Популярность',
+        db_index=True
+    )
+    archived = models.BooleanField(
+        default=False,
+        verbose_name='В архиве'
+    )
+    deleted_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата удаления'
+    )
+
+    objects = LiveManager.from_queryset(PostQuerySet)()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f'{self.text[:15]}'
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date'],
+                name='posts_post_hot_idx',
+                condition=models.Q(archived=False, deleted_at__isnull=True)
+            ),
+            models.Index(
+                fields=['group', '-pub_date'],
+                name='posts_post_hot_group_idx',
+                condition=models.Q(archived=False, deleted_at__isnull=True)
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -58,6 +105,26 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание'
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество записей',
+        db_index=True
+    )
+    authors_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество авторов'
+    )
+    last_post_date = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата последней записи',
+        db_index=True
+    )
+    trend_score = models.FloatField(
+        default=0,
+        verbose_name='Популярность',
+        db_index=True
+    )
 
     def __str__(self):
         return self.title
@@ -81,10 +148,23 @@ class Comment(models.Model):
     text = models.TextField(
         default='Текст комментария'
     )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст в HTML'
+    )
     created = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата и время публикации'
     )
+    deleted_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата удаления'
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.text
@@ -112,3 +192,304 @@ class Follow(models.Model):
                 check=~models.Q(user=models.F('author')),
             ),
         ]
+
+
+class Notification(models.Model):
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KINDS = (
+        (COMMENT, 'Новые комментарии'),
+        (FOLLOW, 'Новые подписчики'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    kind = models.CharField(
+        max_length=16,
+        choices=KINDS,
+        verbose_name='Тип'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Пост'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Последний участник'
+    )
+    count = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Количество событий'
+    )
+    unread = models.BooleanField(
+        default=True,
+        verbose_name='Не прочитано'
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата последнего события'
+    )
+
+    class Meta:
+        ordering = ('-updated',)
+        indexes = [
+            models.Index(
+                fields=['recipient', '-updated'],
+                name='posts_notif_inbox_idx'
+            ),
+        ]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+
+class NotificationEvent(models.Model):
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Получатель'
+    )
+    kind = models.CharField(
+        max_length=16,
+        choices=Notification.KINDS,
+        verbose_name='Тип'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Пост'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Участник'
+    )
+
+    class Meta:
+        verbose_name = 'Событие уведомления'
+        verbose_name_plural = 'События уведомлений'
+
+
+class Inbox(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='inbox'
+    )
+    unread = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Непрочитанных уведомлений'
+    )
+
+
+class Trend(models.Model):
+    POST = 'post'
+    GROUP = 'group'
+    KINDS = (
+        (POST, 'Пост'),
+        (GROUP, 'Группа'),
+    )
+
+    kind = models.CharField(
+        max_length=16,
+        choices=KINDS,
+        verbose_name='Тип'
+    )
+    rank = models.PositiveIntegerField(
+        verbose_name='Место'
+    )
+    score = models.FloatField(
+        verbose_name='Популярность'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    refreshed = models.DateTimeField(
+        verbose_name='Дата пересчета'
+    )
+
+    class Meta:
+        ordering = ('kind', 'rank')
+        indexes = [
+            models.Index(
+                fields=['kind', 'rank'],
+                name='posts_trend_rank_idx'
+            ),
+        ]
+        verbose_name = 'Популярное'
+        verbose_name_plural = 'Популярное'
+
+
+class TrendEvent(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    weight = models.FloatField(
+        verbose_name='Вес'
+    )
+    grouped = models.BooleanField(
+        default=True,
+        verbose_name='Учитывать в группе'
+    )
+
+    class Meta:
+        verbose_name = 'Событие популярности'
+        verbose_name_plural = 'События популярности'
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_like',
+                fields=['user', 'post'],
+            ),
+        ]
+
+
+class LikeCounter(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='like_counters'
+    )
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_like_counter_shard',
+                fields=['post', 'shard'],
+            ),
+        ]
+
+
+class PostRevision(models.Model):
+    """Предыдущая версия поста в виде обратного диффа.
+
+    diff превращает текст следующей версии в текст этой, поэтому
+    актуальная версия всегда лежит целиком в Post.text.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name='Пост'
+    )
+    diff = models.TextField(
+        verbose_name='Обратный дифф текста'
+    )
+    image = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Картинка версии'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата правки',
+        db_index=True
+    )
+
+    class Meta:
+        ordering = ('-created', '-id')
+        indexes = [
+            models.Index(
+                fields=['post', '-created'],
+                name='posts_revision_history_idx'
+            ),
+        ]
+        verbose_name = 'Версия поста'
+        verbose_name_plural = 'Версии постов'
+
+
+class Mention(models.Model):
+    """Упоминание @username в посте или комментарии."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Упомянутый пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор упоминания'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    # Без ограничения в базе: в PostgreSQL posts_comment секционирована,
+    # и id в ней уникален только вместе с created.
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        db_constraint=False,
+        verbose_name='Комментарий'
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата упоминания'
+    )
+
+    class Meta:
+        ordering = ('-created', '-id')
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-id'],
+                name='posts_mention_feed_idx'
+            ),
+        ]
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
@@ -0,0 +1,176 @@
+"""
+Массовая модерация постов.
+
+Операции идут пачками первичных ключей и выполняются set-based
+запросами, не загружая объекты в память. После каждой пачки счетчики
+затронутых групп пересчитываются.
+
+Удаление из интерфейса мягкое: пост или комментарий получает
+deleted_at и пропадает из менеджера objects, а строки физически
+удаляет purge_deleted по истечении срока хранения. Старые посты
+archive_posts переводит в архив: ленты их не читают, но профиль
+и страница поста по-прежнему показывают.
+"""
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from . import stats
+from .models import Comment, Mention, Notification, Post, Trend, User
+from .notifications import recount_inboxes
+
+CHUNK_SIZE = 500
+
+
+def id_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """Выдает пачки первичных ключей queryset по возрастанию."""
+    last = None
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        chunk = list(
+            (ids if last is None else ids.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def delete_rows(queryset):
+    """Удаляет строки queryset и зависимые от них, возвращает их число.
+
+    Удаление идет DELETE ... WHERE по подзапросу, без SELECT строк
+    и без сборщика Django, который загрузил бы их в память.
+    """
+    delete_related(queryset.model, queryset.values('pk'))
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_related(model, ids):
+    """Удаляет или отвязывает строки, ссылающиеся на объекты model.
+
+    Учитываются и скрытые связи (related_name='+'), иначе их строки
+    не дали бы удалить объекты по внешнему ключу. ids — список
+    первичных ключей или подзапрос.
+    """
+    for relation in model._meta.get_fields(include_hidden=True):
+        if not relation.auto_created or relation.concrete:
+            continue
+        if not relation.one_to_many and not relation.one_to_one:
+            continue
+        related = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': ids})
+        if relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        else:
+            delete_rows(related)
+
+
+def affected_groups(ids):
+    return set(Post.objects.filter(pk__in=ids).exclude(
+        group=None).values_list('group_id', flat=True))
+
+
+def delete_posts(queryset, progress=None, chunk_size=CHUNK_SIZE):
+    """Удаляет посты вместе с комментариями, возвращает их число."""
+    deleted = 0
+    for chunk in id_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            groups = affected_groups(chunk)
+            recipients = set(Notification.objects.filter(
+                post__in=chunk, unread=True
+            ).values_list('recipient', flat=True))
+            delete_related(Post, chunk)
+            deleted += Post.all_objects.filter(pk__in=chunk)._raw_delete(
+                queryset.db)
+            stats.reconcile(groups)
+            recount_inboxes(recipients)
+        if progress:
+            progress(deleted)
+    return deleted
+
+
+def regroup_posts(queryset, group, progress=None, chunk_size=CHUNK_SIZE):
+    """Переносит посты в группу group (или убирает из групп)."""
+    moved = 0
+    for chunk in id_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            groups = affected_groups(chunk)
+            moved += Post.objects.filter(pk__in=chunk).update(group=group)
+            if group is not None:
+                groups.add(group.pk)
+            stats.reconcile(groups)
+        if progress:
+            progress(moved)
+    return moved
+
+
+def ban_authors(queryset, progress=None, chunk_size=CHUNK_SIZE):
+    """Блокирует авторов постов и удаляет все их посты и комментарии.
+
+    Возвращает число заблокированных авторов.
+    """
+    authors = set(queryset.values_list('author_id', flat=True))
+    banned = User.objects.filter(pk__in=authors).update(is_active=False)
+    delete_posts(
+        Post.all_objects.filter(author__in=authors), progress, chunk_size)
+    delete_comments(
+        Comment.all_objects.filter(author__in=authors), chunk_size)
+    return banned
+
+
+def delete_comments(queryset, chunk_size=CHUNK_SIZE):
+    deleted = 0
+    for chunk in id_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            deleted += delete_rows(Comment.all_objects.filter(pk__in=chunk))
+    return deleted
+
+
+def soft_delete_post(post):
+    """Скрывает пост и снимает его со счетчиков и популярного."""
+    with transaction.atomic():
+        Post.objects.filter(pk=post.pk).update(deleted_at=timezone.now())
+        if post.group_id is not None:
+            stats.remove_post(post.group_id, post)
+        Trend.objects.filter(post=post).delete()
+        Mention.objects.filter(post=post).delete()
+
+
+def soft_delete_comment(comment):
+    with transaction.atomic():
+        Comment.objects.filter(pk=comment.pk).update(
+            deleted_at=timezone.now())
+        Mention.objects.filter(comment=comment).delete()
+
+
+def archive_posts(before, progress=None, chunk_size=CHUNK_SIZE):
+    """Переводит в архив посты, опубликованные раньше before.
+
+    Архивные посты не входят в счетчики групп, поэтому группы пачки
+    пересчитываются.
+    """
+    archived = 0
+    for chunk in id_chunks(
+            Post.objects.hot().filter(pub_date__lt=before), chunk_size):
+        with transaction.atomic():
+            groups = affected_groups(chunk)
+            archived += Post.objects.filter(pk__in=chunk).update(
+                archived=True)
+            stats.reconcile(groups)
+        if progress:
+            progress(archived)
+    return archived
+
+
+def purge_deleted(before, chunk_size=CHUNK_SIZE):
+    """Физически удаляет записи, мягко удаленные раньше before.
+
+    Возвращает число удаленных постов и комментариев.
+    """
+    return (
+        delete_posts(
+            Post.all_objects.filter(deleted_at__lt=before),
+            chunk_size=chunk_size),
+        delete_comments(
+            Comment.all_objects.filter(deleted_at__lt=before), chunk_size),
+    )
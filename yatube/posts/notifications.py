@@ -0,0 +1,194 @@
+"""
+Уведомления о новых комментариях и подписчиках.
+
+Представления не создают уведомления сами: notify дописывает событие
+в очередь NotificationEvent одной вставкой, а команда flush_writes
+пачками доставляет очередь (deliver_pending). С NOTIFY_INLINE события
+доставляются сразу в запросе. При отложенной записи уведомления
+создает сброс журнала вместе с комментариями и подписками. События
+к одному непрочитанному уведомлению складываются, так что двенадцать
+комментариев к посту дают одно уведомление «12 новых комментариев».
+Число непрочитанных уведомлений хранится счетчиком в Inbox и не
+считается по таблице.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Inbox, Notification, NotificationEvent, Post, User
+
+INBOX_SIZE = 50
+
+
+def event(kind, recipient_id, actor_id, post_id=None):
+    return {
+        'kind': kind,
+        'recipient': recipient_id,
+        'actor': actor_id,
+        'post_id': post_id,
+    }
+
+
+def coalesce(events):
+    """Складывает события с одинаковым получателем, типом и постом."""
+    grouped = {}
+    for entry in events:
+        if entry['recipient'] == entry['actor']:
+            continue
+        key = entry['recipient'], entry['kind'], entry['post_id']
+        count, _ = grouped.get(key, (0, None))
+        grouped[key] = count + 1, entry['actor']
+    return grouped
+
+
+def deliver(events):
+    """Создает или дополняет уведомления, возвращает число событий.
+
+    Непрочитанное уведомление с тем же ключом увеличивается, а не
+    дублируется; счетчик Inbox растет только на новые уведомления.
+    Непрочитанные уведомления читаются только с ключами из событий
+    и не больше INBOX_SIZE на получателя в среднем: предел общий
+    для всей пачки. События об удаленных
+    к моменту сброса постах и пользователях пропускаются.
+    """
+    grouped = coalesce(events)
+    if not grouped:
+        return 0
+    users = set(User.objects.filter(id__in={
+        recipient for recipient, _, _ in grouped
+    } | {actor for _, actor in grouped.values()}).values_list('id', flat=True))
+    posts = set(Post.objects.filter(
+        id__in={post_id for _, _, post_id in grouped if post_id}
+    ).values_list('id', flat=True))
+    grouped = {
+        key: (count, actor if actor in users else None)
+        for key, (count, actor) in grouped.items()
+        if key[0] in users and (key[2] is None or key[2] in posts)
+    }
+    now = timezone.now()
+    recipients = {recipient for recipient, _, _ in grouped}
+    with transaction.atomic():
+        existing = {}
+        for pk, *key in Notification.objects.filter(
+            recipient__in=recipients,
+            kind__in={kind for _, kind, _ in grouped},
+            unread=True
+        ).filter(
+            Q(post=None) | Q(post__in=posts)
+        ).order_by('-updated').values_list(
+            'id', 'recipient', 'kind', 'post'
+        )[:INBOX_SIZE * len(recipients)]:
+            existing.setdefault(tuple(key), pk)
+        created = defaultdict(int)
+        new = []
+        for key, (count, actor) in grouped.items():
+            if key in existing:
+                Notification.objects.filter(id=existing[key]).update(
+                    count=F('count') + count, actor=actor, updated=now)
+                continue
+            recipient, kind, post_id = key
+            created[recipient] += 1
+            new.append(Notification(
+                recipient_id=recipient,
+                kind=kind,
+                post_id=post_id,
+                actor_id=actor,
+                count=count,
+                updated=now
+            ))
+        Notification.objects.bulk_create(new)
+        Inbox.objects.bulk_create(
+            [Inbox(user_id=recipient) for recipient in created],
+            ignore_conflicts=True
+        )
+        by_delta = defaultdict(list)
+        for recipient, delta in created.items():
+            by_delta[delta].append(recipient)
+        for delta, users in by_delta.items():
+            Inbox.objects.filter(user__in=users).update(
+                unread=F('unread') + delta)
+    return sum(count for count, _ in grouped.values())
+
+
+def notify(events):
+    """Ставит события в очередь доставки или, с NOTIFY_INLINE, доставляет."""
+    events = [
+        entry for entry in events if entry['recipient'] != entry['actor']
+    ]
+    if settings.NOTIFY_INLINE:
+        return deliver(events)
+    NotificationEvent.objects.bulk_create([
+        NotificationEvent(
+            kind=entry['kind'],
+            recipient_id=entry['recipient'],
+            actor_id=entry['actor'],
+            post_id=entry['post_id']
+        )
+        for entry in events
+    ])
+    return len(events)
+
+
+def deliver_pending(batch_size=1000):
+    """Доставляет очередь событий пачками, возвращает их число.
+
+    Пачка выбирается с SELECT ... FOR UPDATE SKIP LOCKED там, где
+    база это умеет, так что параллельные запуски не доставят одно
+    событие дважды.
+    """
+    delivered = 0
+    while True:
+        with transaction.atomic():
+            pending = list(NotificationEvent.objects.select_for_update(
+                skip_locked=True
+            ).order_by('pk').values_list(
+                'pk', 'kind', 'recipient', 'actor', 'post'
+            )[:batch_size])
+            if not pending:
+                return delivered
+            delivered += deliver([
+                event(kind, recipient, actor, post)
+                for _, kind, recipient, actor, post in pending
+            ])
+            NotificationEvent.objects.filter(
+                pk__in=[pk for pk, *_ in pending]).delete()
+
+
+def recount_inboxes(user_ids):
+    """Пересчитывает счетчики Inbox пользователей по их уведомлениям.
+
+    Нужен после удаления уведомлений в обход deliver и inbox, например
+    вместе с постами при модерации.
+    """
+    if not user_ids:
+        return
+    unread = Notification.objects.filter(
+        recipient=OuterRef('user'), unread=True
+    ).order_by().values('recipient').annotate(
+        total=Count('pk')).values('total')
+    Inbox.objects.filter(user__in=user_ids).update(
+        unread=Coalesce(Subquery(unread), 0))
+
+
+def unread_count(user_id):
+    if user_id is None:
+        return 0
+    return Inbox.objects.filter(user=user_id).values_list(
+        'unread', flat=True).first() or 0
+
+
+def inbox(user):
+    """Последние уведомления пользователя, отмеченные прочитанными."""
+    notifications = list(user.notifications.select_related(
+        'actor', 'post__author')[:INBOX_SIZE])
+    with transaction.atomic():
+        read = user.notifications.filter(unread=True).update(unread=False)
+        if read:
+            Inbox.objects.filter(user=user).update(
+                unread=Greatest(F('unread') - read, 0))
+    return notifications
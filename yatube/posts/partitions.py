@@ -0,0 +1,121 @@
+"""
+Помесячное секционирование комментариев в PostgreSQL.
+
+posts_comment секционируется по created (RANGE, одна секция на месяц,
+плюс секция DEFAULT для строк вне созданных диапазонов). Вставка
+обновляет индексы только текущей секции, а запросы с условием на
+created читают лишь нужные секции. Секции на будущие месяцы заранее
+создает команда create_partitions.
+
+posts_post не секционируется: на него ссылаются внешние ключи
+комментариев, лайков, уведомлений и популярного, а в PostgreSQL
+ключ секционирования обязан входить в первичный ключ.
+
+В других СУБД (SQLite в тестах) таблица остается обычной, и все
+функции модуля ничего не делают.
+"""
+
+from datetime import date
+
+from django.db import connection as default_connection, transaction
+
+TABLE = 'posts_comment'
+MONTHS_AHEAD = 3
+MIN_VERSION = 110000
+
+
+def supported(connection):
+    return (
+        connection.vendor == 'postgresql'
+        and connection.pg_version >= MIN_VERSION
+    )
+
+
+def is_partitioned(cursor, table=TABLE):
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE relname = %s", [table])
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start, end):
+    """Первые числа месяцев от start до end включительно."""
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month, table=TABLE):
+    return f'{table}_y{month.year}m{month.month:02d}'
+
+
+def default_partition(table=TABLE):
+    return f'{table}_default'
+
+
+def create_partition(cursor, month, table=TABLE):
+    """Создает секцию месяца.
+
+    Если строки этого месяца уже попали в DEFAULT (например, команда
+    долго не запускалась), PostgreSQL не даст создать секцию поверх
+    них. Тогда DEFAULT отсоединяется, строки переносятся в новую
+    секцию, и DEFAULT присоединяется обратно в той же транзакции.
+    """
+    name = partition_name(month, table)
+    default = default_partition(table)
+    bounds = [month.isoformat(), add_months(month, 1).isoformat()]
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [default])
+        has_default, = cursor.fetchone()
+        stranded = False
+        if has_default:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {default} '
+                f'WHERE created >= %s AND created < %s)', bounds)
+            stranded, = cursor.fetchone()
+        if stranded:
+            cursor.execute(
+                f'ALTER TABLE {table} DETACH PARTITION {default}')
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {name} '
+            f'PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)', bounds)
+        if stranded:
+            cursor.execute(
+                f'INSERT INTO {name} SELECT * FROM {default} '
+                f'WHERE created >= %s AND created < %s', bounds)
+            cursor.execute(
+                f'DELETE FROM {default} '
+                f'WHERE created >= %s AND created < %s', bounds)
+            cursor.execute(
+                f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD, today=None,
+                      connection=default_connection):
+    """Создает секции с текущего месяца на months_ahead вперед.
+
+    Возвращает имена секций, которых раньше не было.
+    """
+    if not supported(connection):
+        return []
+    today = today or date.today()
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return []
+        cursor.execute(
+            'SELECT relname FROM pg_class WHERE relname LIKE %s',
+            [f'{TABLE}_y%']
+        )
+        existing = {name for name, in cursor.fetchall()}
+        created = []
+        for month in month_range(today, add_months(today, months_ahead)):
+            if partition_name(month) not in existing:
+                create_partition(cursor, month)
+                created.append(partition_name(month))
+    return created
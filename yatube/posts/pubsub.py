@@ -0,0 +1,137 @@
+"""
+Публикация событий о новых постах.
+
+Брокер по умолчанию живет в памяти процесса: держит последние события
+и будит ждущих подписчиков. Он доходит только до потоков событий того
+же процесса, в котором сохранили пост. Если поток событий обслуживает
+отдельный процесс, нужен общий брокер: DatabaseBroker сам читает новые
+посты из базы. Класс брокера задается настройкой PUBSUB_BROKER, так
+что его можно заменить и, например, на Redis.
+"""
+
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+
+class InProcessBroker:
+    def __init__(self, history=1000):
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=history)
+        self._last_id = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, event):
+        with self._condition:
+            self._last_id += 1
+            self._events.append((self._last_id, event))
+            self._condition.notify_all()
+
+    def wait(self, after_id, timeout):
+        """События с номером больше after_id, ждет не дольше timeout."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._last_id > after_id, timeout)
+            return [
+                (event_id, event) for event_id, event in self._events
+                if event_id > after_id
+            ]
+
+
+class DatabaseBroker(InProcessBroker):
+    """Брокер, общий для всех процессов: события — новые посты в базе.
+
+    Базу опрашивает один поток процесса не чаще раза в poll_seconds,
+    остальные ждут его результата. Номер события — id поста, так что
+    Last-Event-ID понятен любому процессу. publish ничего не делает:
+    пост уже сохранен.
+    """
+    poll_seconds = 1
+
+    def __init__(self, history=1000):
+        super().__init__(history)
+        self._history = history
+        self._polled_at = None
+        self._polling = False
+
+    @property
+    def last_id(self):
+        if self._polled_at is None:
+            self.poll()
+        return self._last_id
+
+    def publish(self, event):
+        pass
+
+    def poll(self):
+        with self._condition:
+            if self._polling:
+                return
+            self._polling = True
+        posts = []
+        try:
+            if self._polled_at is None:
+                last_id = Post.all_objects.aggregate(
+                    last=Max('pk'))['last'] or 0
+            else:
+                posts = list(Post.objects.filter(
+                    pk__gt=self._last_id
+                ).select_related('author').order_by('pk')[:self._history])
+                last_id = posts[-1].pk if posts else self._last_id
+        except Exception:
+            with self._condition:
+                self._polling = False
+            raise
+        with self._condition:
+            self._polling = False
+            self._polled_at = time.monotonic()
+            for post in posts:
+                self._events.append((post.pk, post_event(post)))
+            self._last_id = max(self._last_id, last_id)
+            self._condition.notify_all()
+
+    def wait(self, after_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._polled_at is None or (
+                    time.monotonic() - self._polled_at >= self.poll_seconds):
+                self.poll()
+            with self._condition:
+                events = [
+                    (event_id, event) for event_id, event in self._events
+                    if event_id > after_id
+                ]
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._condition.wait(min(self.poll_seconds, remaining))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.PUBSUB_BROKER)()
+        return _broker
+
+
+def post_event(post):
+    return {
+        'id': post.id,
+        'author_id': post.author_id,
+        'author': post.author.username,
+        'group_id': post.group_id,
+    }
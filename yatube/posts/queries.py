@@ -0,0 +1,47 @@
+from django.db.models import (BooleanField, Count, Exists, IntegerField,
+                              OuterRef, Subquery, Value)
+from django.db.models.functions import Coalesce
+
+from .models import Follow, Post
+
+AUTHOR_STATS = ('posts_count', 'followers_count', 'following_count')
+
+
+def count_subquery(queryset, field, ref):
+    """Подзапрос с количеством строк queryset, где field = ref."""
+    counts = queryset.filter(
+        **{field: OuterRef(ref)}
+    ).order_by().values(field).annotate(total=Count('*')).values('total')
+    return Coalesce(
+        Subquery(counts, output_field=IntegerField()),
+        0
+    )
+
+
+def author_stats(user, ref='pk'):
+    """Аннотации со счетчиками автора и признаком подписки.
+
+    Позволяют получить автора (или пост по ref='author') вместе
+    со всеми данными для author.html одним SQL-запросом.
+    """
+    if user.is_authenticated:
+        is_following = Exists(
+            Follow.objects.filter(user=user.pk, author=OuterRef(ref))
+        )
+    else:
+        is_following = Value(False, output_field=BooleanField())
+    return {
+        'posts_count': count_subquery(Post.objects.all(), 'author', ref),
+        'followers_count': count_subquery(
+            Follow.objects.all(), 'author', ref),
+        'following_count': count_subquery(
+            Follow.objects.all(), 'user', ref),
+        'is_following': is_following,
+    }
+
+
+def copy_author_stats(post):
+    """Переносит аннотации поста на его автора для author.html."""
+    for name in AUTHOR_STATS:
+        setattr(post.author, name, getattr(post, name))
+    return post.author
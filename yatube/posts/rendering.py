@@ -0,0 +1,25 @@
+from django import shortcuts
+from django.conf import settings
+
+from users.identity import get_identity
+
+from .context_processors import events, notifications
+
+
+def render(request, template_name, context=None, status=None):
+    """render(), отдающий шаблоны из JINJA2_TEMPLATES движку Jinja2.
+
+    У бэкенда Jinja2 нет контекстных процессоров, поэтому личность
+    пользователя, счетчик уведомлений и адрес потока событий
+    передаются в контекст явно.
+    """
+    if template_name not in settings.JINJA2_TEMPLATES:
+        return shortcuts.render(request, template_name, context, status=status)
+    context = dict(
+        context or {},
+        viewer=get_identity(request),
+        **notifications(request),
+        **events(request)
+    )
+    return shortcuts.render(
+        request, template_name, context, status=status, using='jinja2')
@@ -0,0 +1,87 @@
+"""
+История правок постов.
+
+Актуальный текст хранится только в Post.text, поэтому ленты читают
+посты без обращения к истории. При правке сохраняется обратный дифф:
+список кусков, где пара [начало, конец] ссылается на отрезок нового
+текста, а строка — на фрагмент, которого в новом тексте нет. Из
+текста следующей версии и диффа восстанавливается предыдущая, так
+что историю можно раскрутить назад от Post.text. Старые версии
+удаляются с конца цепочки (см. prune), и оставшиеся восстанавливаются
+по-прежнему.
+"""
+
+import json
+from difflib import SequenceMatcher
+
+from .models import PostRevision
+from .moderation import CHUNK_SIZE, id_chunks
+
+HISTORY_SIZE = 50
+
+
+def reverse_diff(new, old):
+    """Куски, из которых по тексту new собирается текст old."""
+    chunks = []
+    matcher = SequenceMatcher(None, new, old, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            chunks.append([i1, i2])
+        elif j2 > j1:
+            chunks.append(old[j1:j2])
+    return chunks
+
+
+def apply_diff(new, chunks):
+    return ''.join(
+        chunk if isinstance(chunk, str) else new[chunk[0]:chunk[1]]
+        for chunk in chunks
+    )
+
+
+def record(post, previous_text, previous_image):
+    """Сохраняет версию поста до правки, если пост изменился."""
+    previous_image = previous_image or ''
+    if (previous_text, previous_image) == (post.text, post.image.name or ''):
+        return None
+    return PostRevision.objects.create(
+        post=post,
+        diff=json.dumps(
+            reverse_diff(post.text, previous_text),
+            ensure_ascii=False,
+            separators=(',', ':')
+        ),
+        image=previous_image
+    )
+
+
+def history(post, size=HISTORY_SIZE):
+    """Последние версии поста, начиная с актуальной.
+
+    Каждая версия — словарь с текстом, картинкой и датой, когда ее
+    сменила следующая правка (None у актуальной).
+    """
+    versions = [
+        {'text': post.text, 'image': post.image.name or '', 'until': None}
+    ]
+    for revision in post.revisions.all()[:size]:
+        chunks = json.loads(revision.diff)
+        versions.append({
+            'text': apply_diff(versions[-1]['text'], chunks),
+            'image': revision.image,
+            'until': revision.created,
+        })
+    return versions
+
+
+def prune(before, chunk_size=CHUNK_SIZE):
+    """Удаляет версии, сохраненные раньше before, возвращает их число.
+
+    Версии поста упорядочены по дате, поэтому удаляется хвост цепочки
+    и более новые версии восстанавливаются как прежде.
+    """
+    pruned = 0
+    for chunk in id_chunks(
+            PostRevision.objects.filter(created__lt=before), chunk_size):
+        pruned += PostRevision.objects.filter(pk__in=chunk).delete()[0]
+    return pruned
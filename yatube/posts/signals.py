@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import markup, revisions, stats, trending
+from .mentions import index_mentions
+from .models import Comment, Follow, Post
+from .pubsub import get_broker, post_event
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text(sender, instance, **kwargs):
+    markup.render_html([instance])
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, **kwargs):
+    instance.previous_group_id = None
+    instance.previous_version = None
+    instance.previous_text = None
+    if instance.pk is not None:
+        previous = Post.all_objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'text', 'image').first()
+        if previous is not None:
+            instance.previous_group_id = previous[0]
+            instance.previous_version = previous[1:]
+            instance.previous_text = previous[1]
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_text(sender, instance, **kwargs):
+    instance.previous_text = None
+    if instance.pk is not None:
+        instance.previous_text = Comment.all_objects.filter(
+            pk=instance.pk
+        ).values_list('text', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats(sender, instance, created, **kwargs):
+    previous = None if created else instance.previous_group_id
+    if previous == instance.group_id:
+        return
+    if previous is not None:
+        stats.remove_post(previous, instance)
+    if instance.group_id is not None:
+        stats.add_post(instance.group_id, instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_group_stats(sender, instance, **kwargs):
+    if instance.group_id is not None:
+        stats.remove_post(instance.group_id, instance)
+
+
+@receiver(post_save, sender=Post)
+def publish_post(sender, instance, created, **kwargs):
+    if created:
+        event = post_event(instance)
+        transaction.on_commit(lambda: get_broker().publish(event))
+
+
+@receiver(post_save, sender=Post)
+def score_post(sender, instance, created, **kwargs):
+    if created:
+        trending.record_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def score_comment(sender, instance, created, **kwargs):
+    if created:
+        trending.record_comments([instance.post_id])
+
+
+@receiver(post_save, sender=Follow)
+def score_follow(sender, instance, created, **kwargs):
+    if created:
+        trending.record_follows([instance.author_id])
+
+
+@receiver(post_save, sender=Post)
+def save_revision(sender, instance, created, **kwargs):
+    if not created and instance.previous_version is not None:
+        revisions.record(instance, *instance.previous_version)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_mentions(sender, instance, created, **kwargs):
+    if created or instance.previous_text != instance.text:
+        index_mentions([instance], replace=not created)
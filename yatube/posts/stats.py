@@ -0,0 +1,83 @@
+"""
+Счетчики активности групп.
+
+Число записей, число авторов и дата последней записи хранятся в Group
+и обновляются при сохранении и удалении постов, поэтому каталог групп
+не считает записи каждой группы при каждом показе. Считаются только
+посты лент (Post.objects.hot()), как на странице группы: архивные
+посты в счетчики не входят, и archive_posts их пересчитывает.
+"""
+
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Group, Post
+
+
+def has_other_posts(group_id, post):
+    return Post.objects.hot().filter(
+        group_id=group_id,
+        author_id=post.author_id
+    ).exclude(pk=post.pk).exists()
+
+
+def add_post(group_id, post):
+    """Учитывает пост, появившийся в группе."""
+    if post.archived:
+        return
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + 1,
+        authors_count=(
+            F('authors_count') + int(not has_other_posts(group_id, post))),
+        last_post_date=Greatest(
+            Coalesce('last_post_date', post.pub_date), post.pub_date
+        )
+    )
+
+
+def remove_post(group_id, post):
+    """Учитывает пост, удаленный из группы."""
+    if post.archived:
+        return
+    remaining = Post.objects.hot().filter(
+        group_id=group_id).exclude(pk=post.pk)
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') - 1,
+        authors_count=(
+            F('authors_count') - int(not has_other_posts(group_id, post))),
+        last_post_date=remaining.aggregate(last=Max('pub_date'))['last']
+    )
+
+
+def reconcile(group_ids=None):
+    """Пересчитывает счетчики групп одним агрегирующим запросом.
+
+    Возвращает число исправленных групп.
+    """
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    actual = {
+        row['group']: row for row in Post.objects.hot().filter(
+            group__in=groups
+        ).order_by().values('group').annotate(
+            posts=Count('id'),
+            authors=Count('author', distinct=True),
+            last=Max('pub_date')
+        )
+    }
+    fixed = 0
+    for group in groups.only(
+            'posts_count', 'authors_count', 'last_post_date'):
+        row = actual.get(group.pk, {'posts': 0, 'authors': 0, 'last': None})
+        stats = (row['posts'], row['authors'], row['last'])
+        if stats == (
+                group.posts_count, group.authors_count, group.last_post_date):
+            continue
+        Group.objects.filter(pk=group.pk).update(
+            posts_count=row['posts'],
+            authors_count=row['authors'],
+            last_post_date=row['last']
+        )
+        fixed += 1
+    return fixed
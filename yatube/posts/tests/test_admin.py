@@ -0,0 +1,168 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import notifications
+from posts.models import (Comment, Follow, Group, Inbox, Mention,
+                          Notification, Post, Trend, User)
+
+
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin')
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Группа',
+            description='Описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Комментарий')
+        Follow.objects.create(user=cls.admin, author=cls.user)
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.admin)
+
+    def test_changelists(self):
+        """Списки постов, групп, комментариев и подписок открываются."""
+        for model in ['post', 'group', 'comment', 'follow']:
+            with self.subTest(model=model):
+                url = reverse(f'admin:posts_{model}_changelist')
+                response = self.admin_client.get(url, {'q': 'тест'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_count_is_estimated_only_without_filters(self):
+        """Оценка числа строк берется только для полного списка."""
+        url = reverse('admin:posts_post_changelist')
+        for params, estimate in (
+                ({}, True), ({'o': '-3'}, True), ({'q': 'тест'}, False),
+                ({'author__id__exact': self.user.pk}, False)):
+            with self.subTest(params=params):
+                response = self.admin_client.get(url, params)
+                self.assertEqual(
+                    response.context['cl'].paginator.estimate, estimate)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.admin_client.get(url)
+        return len(context)
+
+    def test_post_changelist_queries_do_not_grow(self):
+        """Авторы и группы постов загружаются вместе со списком."""
+        url = reverse('admin:posts_post_changelist')
+        queries_before = self.count_queries(url)
+        for index in range(5):
+            Post.objects.create(
+                text=f'Пост {index}',
+                author=User.objects.create_user(username=f'author{index}'),
+                group=self.group
+            )
+        self.assertEqual(self.count_queries(url), queries_before)
+
+
+class ModerationActionsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin')
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.admin)
+        cls.CHANGELIST = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        self.spammer = User.objects.create_user(username='spammer')
+        self.user = User.objects.create_user(username='testuser')
+        self.group = Group.objects.create(
+            title='Группа', description='Описание', slug='test-slug')
+        self.other_group = Group.objects.create(
+            title='Другая', description='Описание', slug='test-other-slug')
+        self.spam = [
+            Post.objects.create(
+                text=f'Спам {index}', author=self.spammer, group=self.group)
+            for index in range(3)
+        ]
+        self.post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group)
+        Comment.objects.create(
+            post=self.spam[0], author=self.user, text='Комментарий')
+        Comment.objects.create(
+            post=self.post, author=self.spammer, text='Спам')
+
+    def run_action(self, action, posts, **data):
+        return self.admin_client.post(self.CHANGELIST, dict(
+            data,
+            action=action,
+            _selected_action=[post.pk for post in posts]
+        ))
+
+    def test_delete_posts(self):
+        """Посты удаляются вместе с комментариями, счетчики верны."""
+        self.run_action('delete_posts', self.spam)
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(self.group.authors_count, 1)
+
+    def test_delete_posts_with_hidden_relations(self):
+        """Уведомления, упоминания и популярное не мешают удалению."""
+        post = Post.objects.create(
+            text='Спам для @testuser', author=self.spammer, group=self.group)
+        notifications.deliver([notifications.event(
+            Notification.COMMENT, self.spammer.pk, self.user.pk, post.pk)])
+        Trend.objects.create(
+            kind=Trend.POST, rank=1, score=1, post=post,
+            refreshed=timezone.now())
+        self.assertTrue(Mention.objects.filter(post=post).exists())
+        self.assertEqual(Inbox.objects.get(user=self.spammer).unread, 1)
+        self.run_action('ban_authors', [post])
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(Mention.objects.exists())
+        self.assertFalse(Trend.objects.exists())
+        self.assertEqual(Inbox.objects.get(user=self.spammer).unread, 0)
+
+    def test_comments_are_deleted_without_loading(self):
+        """Комментарии с упоминаниями удаляются без выборки их строк."""
+        Comment.objects.create(
+            post=self.spam[0], author=self.user, text='@spammer, нет')
+        self.assertTrue(Mention.objects.filter(comment__isnull=False))
+        with CaptureQueriesContext(connection) as context:
+            self.run_action('delete_posts', self.spam)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"posts_comment"."text"' in query['sql']
+        ])
+        self.assertFalse(Mention.objects.exists())
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_regroup_posts(self):
+        """Посты переносятся в другую группу."""
+        self.run_action('regroup_posts', self.spam, group=self.other_group.pk)
+        self.assertEqual(
+            Post.objects.filter(group=self.other_group).count(), 3)
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(self.other_group.posts_count, 3)
+
+    def test_ban_authors(self):
+        """Автор блокируется, его посты и комментарии удаляются."""
+        self.run_action('ban_authors', self.spam[:1])
+        self.spammer.refresh_from_db()
+        self.assertFalse(self.spammer.is_active)
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
@@ -0,0 +1,93 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+API_POSTS = reverse('api_posts')
+API_FOLLOW_POSTS = reverse('api_follow_posts')
+USERNAME = 'testuser'
+ITEMS_COUNT = 5
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Мария')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug='test-slug')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {index}', author=cls.user, group=cls.group)
+            for index in range(ITEMS_COUNT)
+        ]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def test_keyset_pagination(self):
+        """Курсор проходит всю ленту без пропусков и повторов."""
+        ids = []
+        url = API_POSTS + '?limit=2'
+        while url:
+            data = self.client.get(url).json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next'] and API_POSTS + (
+                f'?limit=2&cursor={data["next"]}')
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_fields_and_expand(self):
+        """Выбираются только нужные поля, автор раскрывается."""
+        data = self.client.get(
+            API_POSTS, {'fields': 'id,author', 'expand': 'author'}).json()
+        self.assertEqual(data['results'][0], {
+            'id': self.posts[-1].id,
+            'author': {
+                'id': self.user.id,
+                'username': USERNAME,
+                'first_name': 'Мария',
+                'last_name': '',
+            },
+        })
+
+    def test_unknown_field(self):
+        response = self.client.get(API_POSTS, {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit_must_be_positive(self):
+        for limit in ('0', '-5', 'abc'):
+            with self.subTest(limit=limit):
+                response = self.client.get(API_POSTS, {'limit': limit})
+                self.assertEqual(response.status_code, 400)
+
+    def test_feeds_and_detail(self):
+        """Ленты профиля, группы, подписок, пост и комментарии."""
+        post = self.posts[0]
+        urls = [
+            reverse('api_profile_posts', kwargs={'username': USERNAME}),
+            reverse('api_group_posts', kwargs={'slug': 'test-slug'}),
+            API_FOLLOW_POSTS,
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.reader_client.get(url).json()
+                self.assertEqual(len(data['results']), ITEMS_COUNT)
+        detail = self.client.get(
+            reverse('api_post', kwargs={'post_id': post.id})).json()
+        self.assertEqual(detail['text'], post.text)
+        self.assertEqual(detail['group'], self.group.id)
+        comments = self.client.get(reverse(
+            'api_post_comments', kwargs={'post_id': post.id})).json()
+        self.assertEqual(comments['results'][0]['text'], self.comment.text)
+
+    def test_follow_feed_requires_login(self):
+        self.assertEqual(self.client.get(API_FOLLOW_POSTS).status_code, 401)
+
+    def test_page_is_one_query(self):
+        """Страница с раскрытыми связями читается одним запросом."""
+        with self.assertNumQueries(1):
+            self.client.get(API_POSTS, {'expand': 'author,group'})
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post, User
+
+INDEX = reverse('index')
+
+
+class SoftDeleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group)
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.POST = reverse('post', args=['author', self.post.id])
+        self.POST_DELETE = reverse(
+            'post_delete', args=['author', self.post.id])
+        self.COMMENT_DELETE = reverse(
+            'comment_delete', args=['author', self.post.id, self.comment.id])
+
+    def test_only_author_deletes_post(self):
+        """Удаленный автором пост скрыт, но строка остается до очистки."""
+        self.reader_client.post(self.POST_DELETE)
+        self.assertTrue(Post.objects.filter(id=self.post.id).exists())
+        response = self.author_client.post(self.POST_DELETE)
+        self.assertRedirects(response, reverse('profile', args=['author']))
+        self.assertFalse(Post.objects.filter(id=self.post.id).exists())
+        self.assertTrue(Post.all_objects.filter(id=self.post.id).exists())
+        self.assertEqual(self.client.get(self.POST).status_code, 404)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+
+    def test_comment_author_deletes_comment(self):
+        self.reader_client.post(self.COMMENT_DELETE)
+        self.assertFalse(self.post.comments.exists())
+        self.assertTrue(Comment.all_objects.filter(
+            id=self.comment.id).exists())
+
+    def test_archive_and_purge(self):
+        """Старые посты уходят из лент, но доступны на странице поста."""
+        Post.objects.filter(id=self.post.id).update(
+            pub_date=timezone.now() - timedelta(days=400))
+        deleted = Post.objects.create(text='Удаленный', author=self.author)
+        Post.objects.filter(id=deleted.id).update(
+            deleted_at=timezone.now() - timedelta(days=40))
+        out = StringIO()
+        call_command('archive_posts', '--chunk-size=1', stdout=out)
+        self.assertIn(
+            'Архивировано постов: 1, удалено постов: 1', out.getvalue())
+        self.assertNotIn(
+            self.post, self.client.get(INDEX).context['page'].object_list)
+        self.assertEqual(self.client.get(self.POST).status_code, 200)
+        profile = self.client.get(reverse('profile', args=['author']))
+        self.assertIn(self.post, profile.context['page'].object_list)
+        self.assertFalse(Post.all_objects.filter(id=deleted.id).exists())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.group.authors_count, 0)
+        self.assertIsNone(self.group.last_post_date)
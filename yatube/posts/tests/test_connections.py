@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import db
+
+INDEX = reverse('index')
+USERNAME = 'testuser'
+ANOTHER_USERNAME = 'another'
+FOLLOW = reverse(
+    'profile_follow',
+    kwargs={'username': ANOTHER_USERNAME}
+)
+
+
+class ConnectionMiddlewareTest(TestCase):
+    def test_connection_is_reused(self):
+        """Открытое соединение переиспользуется следующим запросом."""
+        connection.ensure_connection()
+        before = db.metrics()
+        self.client.get(INDEX)
+        after = db.metrics()
+        self.assertEqual(after['requests'] - before['requests'], 1)
+        self.assertEqual(after['reused'] - before['reused'], 1)
+
+    def test_broken_connection_is_closed(self):
+        """Сломанное соединение закрывается до выполнения запроса."""
+        connection.ensure_connection()
+        settings_dict = dict(connection.settings_dict)
+        settings_dict['CONN_HEALTH_CHECKS'] = True
+        before = db.metrics()
+        with mock.patch.object(connection, 'settings_dict', settings_dict), \
+                mock.patch.object(connection, 'is_usable') as is_usable, \
+                mock.patch.object(connection, 'close') as close:
+            is_usable.return_value = False
+            self.assertFalse(db.check_connection(connection))
+        close.assert_called_once()
+        self.assertEqual(
+            db.metrics()['health_check_failures']
+            - before['health_check_failures'],
+            1
+        )
+
+    def test_health_check_is_opt_in(self):
+        """Без CONN_HEALTH_CHECKS соединение не проверяется запросом."""
+        connection.ensure_connection()
+        settings_dict = dict(connection.settings_dict)
+        settings_dict['CONN_HEALTH_CHECKS'] = False
+        with mock.patch.object(connection, 'settings_dict', settings_dict), \
+                mock.patch.object(connection, 'is_usable') as is_usable:
+            self.assertTrue(db.check_connection(connection))
+        is_usable.assert_not_called()
+
+
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = db.ReplicaRouter()
+
+    def test_routing_without_replicas(self):
+        """Без реплик чтение идет в основную базу."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_read_goes_to_replica(self):
+        """Отпущенное чтение идет на реплику, запись — в основную базу."""
+        db.pin_to_primary(False)
+        try:
+            self.assertEqual(self.router.db_for_read(Post), 'replica1')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+        finally:
+            db.pin_to_primary()
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_reads_outside_requests_go_to_primary(self):
+        """Команды и задачи вне запроса читают из основной базы."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        User.objects.create_user(username=ANOTHER_USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def test_write_sets_sticky_cookie(self):
+        """После записи пользователь читает из основной базы."""
+        response = self.authorized_client.get(FOLLOW)
+        self.assertIn(db.PRIMARY_COOKIE, response.cookies)
+
+    def test_read_does_not_set_sticky_cookie(self):
+        response = self.authorized_client.get(INDEX)
+        self.assertNotIn(db.PRIMARY_COOKIE, response.cookies)
+        self.assertTrue(db.use_primary())
+
+    def test_notifications_page_is_a_write(self):
+        """Страница уведомлений отмечает их прочитанными."""
+        response = self.authorized_client.get(reverse('notifications'))
+        self.assertIn(db.PRIMARY_COOKIE, response.cookies)
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts.digests import top_posts
+from posts.models import Comment, Follow, Post, User
+
+EMAIL_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+    EMAIL_FILE_PATH=EMAIL_DIR
+)
+class DigestTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com')
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{index}', email=f'reader{index}@example.com')
+            for index in range(3)
+        ]
+        User.objects.create_user(username='silent', email='')
+        for reader in cls.readers[:2]:
+            Follow.objects.create(user=reader, author=cls.author)
+        cls.popular = Post.objects.create(
+            text='Обсуждаемый', author=cls.author)
+        cls.quiet = Post.objects.create(text='Тихий', author=cls.author)
+        old = Post.objects.create(text='Старый', author=cls.author)
+        Post.objects.filter(id=old.id).update(
+            pub_date=timezone.now() - timedelta(days=2))
+        Comment.objects.create(
+            post=cls.popular, author=cls.readers[0], text='Да')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(EMAIL_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_digests_are_written_to_files(self):
+        """Дайджест получают только подписчики, лучшие посты идут первыми."""
+        out = StringIO()
+        with self.assertNumQueries(7):
+            call_command('send_digests', '--chunk-size=2', stdout=out)
+        self.assertIn('Отправлено писем: 2', out.getvalue())
+        messages = ''.join(
+            open(os.path.join(EMAIL_DIR, name)).read()
+            for name in os.listdir(EMAIL_DIR)
+        )
+        self.assertEqual(messages.count('To: reader'), 2)
+        self.assertNotIn('reader2@', messages)
+        self.assertLess(
+            messages.index('Обсуждаемый'), messages.index('Тихий'))
+        self.assertNotIn('Старый', messages)
+        self.assertIn(f'/author/{self.popular.id}/', messages)
+
+    def test_deleted_comments_are_not_counted(self):
+        for _ in range(2):
+            Comment.objects.create(
+                post=self.quiet, author=self.readers[1], text='Нет',
+                deleted_at=timezone.now())
+        digest = top_posts(
+            [self.readers[0].id], timezone.now() - timedelta(days=1))
+        self.assertEqual(
+            [(post['id'], post['comments_count'])
+             for post in digest[self.readers[0].id]],
+            [(self.popular.id, 1), (self.quiet.id, 0)]
+        )
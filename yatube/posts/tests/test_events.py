@@ -0,0 +1,82 @@
+import json
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, User
+from posts.pubsub import (DatabaseBroker, InProcessBroker, get_broker,
+                          post_event)
+
+POST_EVENTS = reverse('post_events')
+INDEX = reverse('index')
+
+
+@override_settings(SSE_ENABLED=True, SSE_MAX_SECONDS=0.2)
+class PostEventsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def read_events(self, client, url):
+        broker = get_broker()
+        last_id = broker.last_id
+        for author in [self.author, self.stranger]:
+            broker.publish(post_event(
+                Post.objects.create(text='Пост', author=author)))
+        response = client.get(url, HTTP_LAST_EVENT_ID=str(last_id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        return [
+            json.loads(line[len('data: '):])
+            for line in body.splitlines() if line.startswith('data: ')
+        ]
+
+    def test_index_feed_gets_all_posts(self):
+        events = self.read_events(self.client, POST_EVENTS)
+        self.assertEqual(
+            [event['author'] for event in events], ['author', 'stranger'])
+
+    def test_follow_feed_gets_followed_authors(self):
+        """Лента подписок получает только посты избранных авторов."""
+        events = self.read_events(
+            self.reader_client, POST_EVENTS + '?feed=follow')
+        self.assertEqual([event['author'] for event in events], ['author'])
+        self.assertEqual(events[0]['url'], reverse(
+            'post', args=['author', events[0]['id']]))
+
+
+class EventsDisabledTest(TestCase):
+    def test_stream_is_off_by_default(self):
+        """Без SSE_ENABLED поток закрыт и страницы его не открывают."""
+        self.assertEqual(self.client.get(POST_EVENTS).status_code, 404)
+        self.assertNotContains(self.client.get(INDEX), 'EventSource')
+        with self.settings(SSE_ENABLED=True):
+            self.assertContains(self.client.get(INDEX), POST_EVENTS)
+
+
+class InProcessBrokerTest(TestCase):
+    def test_wait_returns_new_events(self):
+        broker = InProcessBroker(history=2)
+        self.assertEqual(broker.wait(0, timeout=0), [])
+        for index in range(3):
+            broker.publish(index)
+        self.assertEqual(broker.wait(1, timeout=0), [(2, 1), (3, 2)])
+
+
+class DatabaseBrokerTest(TestCase):
+    def test_new_posts_are_read_from_database(self):
+        """Брокер видит посты, сохраненные в любом процессе."""
+        author = User.objects.create_user(username='author')
+        broker = DatabaseBroker()
+        broker.poll_seconds = 0
+        last_id = broker.last_id
+        self.assertEqual(broker.wait(last_id, timeout=0), [])
+        post = Post.objects.create(text='Пост', author=author)
+        self.assertEqual(
+            broker.wait(last_id, timeout=0), [(post.pk, post_event(post))])
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+USERNAME = 'testuser'
+GROUP_SLUG = 'test-slug'
+POSTS_RSS = reverse('posts_rss')
+POSTS_ATOM = reverse('posts_atom')
+GROUP_RSS = reverse('group_rss', kwargs={'slug': GROUP_SLUG})
+GROUP_ATOM = reverse('group_atom', kwargs={'slug': GROUP_SLUG})
+AUTHOR_RSS = reverse('author_rss', kwargs={'username': USERNAME})
+AUTHOR_ATOM = reverse('author_atom', kwargs={'username': USERNAME})
+
+
+class FeedsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug=GROUP_SLUG)
+        cls.post = Post.objects.create(
+            text='Пост в ленте', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds(self):
+        """Ленты отдают посты в нужном формате."""
+        feeds = [
+            [POSTS_RSS, 'application/rss+xml'],
+            [POSTS_ATOM, 'application/atom+xml'],
+            [GROUP_RSS, 'application/rss+xml'],
+            [GROUP_ATOM, 'application/atom+xml'],
+            [AUTHOR_RSS, 'application/rss+xml'],
+            [AUTHOR_ATOM, 'application/atom+xml'],
+        ]
+        for url, content_type in feeds:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertContains(response, 'Пост в ленте')
+
+    def test_conditional_get(self):
+        """Неизмененная лента отдает 304 за один запрос к базе."""
+        etag = self.client.get(GROUP_RSS)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(GROUP_RSS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_does_not_depend_on_cache(self):
+        """ETag берется из базы, поэтому одинаков во всех воркерах."""
+        etag = self.client.get(POSTS_RSS)['ETag']
+        cache.clear()
+        response = self.client.get(POSTS_RSS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edited_post_changes_etag(self):
+        """Правка поста меняет ETag и содержимое ленты."""
+        etag = self.client.get(GROUP_ATOM)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        response = self.client.get(GROUP_ATOM, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Исправленный пост')
+
+    def test_new_post_invalidates_feed(self):
+        """Новый пост сразу попадает в ленту."""
+        etag = self.client.get(AUTHOR_ATOM)['ETag']
+        Post.objects.create(text='Свежий пост', author=self.user)
+        response = self.client.get(AUTHOR_ATOM, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Свежий пост')
+
+    def test_unknown_group(self):
+        url = reverse('group_rss', kwargs={'slug': 'unknown'})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+GROUPS = reverse('groups')
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.another_user = User.objects.create_user(username='another')
+
+    def setUp(self):
+        self.group = Group.objects.create(
+            title='Группа',
+            description='Описание',
+            slug='test-slug'
+        )
+        self.other_group = Group.objects.create(
+            title='Другая группа',
+            description='Описание',
+            slug='test-other-slug'
+        )
+
+    def assertStats(self, group, posts, authors):
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, posts)
+        self.assertEqual(group.authors_count, authors)
+
+    def test_stats_follow_posts(self):
+        """Счетчики группы меняются при создании, переносе и удалении."""
+        first = Post.objects.create(
+            text='Первый', author=self.user, group=self.group)
+        second = Post.objects.create(
+            text='Второй', author=self.user, group=self.group)
+        third = Post.objects.create(
+            text='Третий', author=self.another_user, group=self.group)
+        self.assertStats(self.group, 3, 2)
+        self.assertEqual(self.group.last_post_date, third.pub_date)
+        third.group = self.other_group
+        third.save()
+        self.assertStats(self.group, 2, 1)
+        self.assertStats(self.other_group, 1, 1)
+        self.assertEqual(self.group.last_post_date, second.pub_date)
+        second.delete()
+        first.delete()
+        self.assertStats(self.group, 0, 0)
+        self.assertIsNone(self.group.last_post_date)
+
+    def test_reconcile_fixes_stats(self):
+        """Команда сверки исправляет расхождения счетчиков."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        Group.objects.update(posts_count=10, authors_count=5)
+        call_command('reconcile_group_stats', stdout=StringIO())
+        self.assertStats(self.group, 1, 1)
+        self.assertStats(self.other_group, 0, 0)
+
+    def test_groups_sorted_by_posts(self):
+        """Каталог сортирует группы по числу записей."""
+        for text in ['Первый', 'Второй']:
+            Post.objects.create(
+                text=text, author=self.user, group=self.other_group)
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        page = self.client.get(GROUPS, {'sort': 'posts'}).context['page']
+        self.assertEqual(list(page), [self.other_group, self.group])
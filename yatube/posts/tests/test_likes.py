@@ -0,0 +1,65 @@
+from django.db import IntegrityError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.likes import LIKE_SHARDS, like_counts
+from posts.models import Like, LikeCounter, Post, User
+
+INDEX = reverse('index')
+
+
+class LikesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.other_post = Post.objects.create(text='Другой', author=cls.author)
+        cls.POST_LIKE = reverse('post_like', args=['author', cls.post.id])
+        cls.readers = [
+            User.objects.create_user(username=f'reader{index}')
+            for index in range(20)
+        ]
+
+    def like(self, user, url=None):
+        client = Client()
+        client.force_login(user)
+        return client.post(url or self.POST_LIKE)
+
+    def test_like_toggles(self):
+        """Повторное нажатие снимает лайк."""
+        response = self.like(self.readers[0])
+        self.assertRedirects(
+            response, reverse('post', args=['author', self.post.id]))
+        self.assertTrue(Like.objects.filter(user=self.readers[0]).exists())
+        self.like(self.readers[0])
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(like_counts([self.post.id]), {self.post.id: 0})
+
+    def test_like_is_unique(self):
+        Like.objects.create(user=self.author, post=self.post)
+        with self.assertRaises(IntegrityError):
+            Like.objects.create(user=self.author, post=self.post)
+
+    def test_counts_are_sharded(self):
+        """Лайки расходятся по строкам счетчика и суммируются в ленте."""
+        for reader in self.readers:
+            self.like(reader)
+        self.like(self.readers[0], reverse(
+            'post_like', args=['author', self.other_post.id]))
+        counters = LikeCounter.objects.filter(post=self.post)
+        self.assertGreater(counters.count(), 1)
+        self.assertLessEqual(counters.count(), LIKE_SHARDS)
+        with self.assertNumQueries(1):
+            counts = like_counts([self.post.id, self.other_post.id])
+        self.assertEqual(
+            counts, {self.post.id: len(self.readers), self.other_post.id: 1})
+        page = self.client.get(INDEX).context['page']
+        self.assertEqual(
+            {post.id: post.likes_count for post in page},
+            {self.post.id: len(self.readers), self.other_post.id: 1})
+
+    def test_like_requires_post_method(self):
+        client = Client()
+        client.force_login(self.readers[0])
+        self.assertEqual(client.get(self.POST_LIKE).status_code, 405)
@@ -0,0 +1,60 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.markup import render
+from posts.models import Comment, Group, Post, User
+
+
+class MarkupTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def test_render_escapes_and_marks_up(self):
+        self.assertEqual(
+            render('<b>**жирный** и *курсив*\n`<code>`', (), ()),
+            '&lt;b&gt;<strong>жирный</strong> и <em>курсив</em><br>'
+            '<code>&lt;code&gt;</code>'
+        )
+        self.assertEqual(
+            render('[сайт](https://example.com/?a=1&b=2) [x](javascript:1)'),
+            '<a href="https://example.com/?a=1&amp;b=2" '
+            'rel="nofollow noopener">сайт</a> [x](javascript:1)'
+        )
+
+    def test_html_is_stored_on_save(self):
+        """Упоминания и группы превращаются в ссылки при сохранении."""
+        self.author_client.post(reverse('new_post'), data={
+            'text': 'Привет, @author и @nobody! #test-slug #missing'})
+        post = Post.objects.get()
+        profile = reverse('profile', args=['author'])
+        group = reverse('group_posts', args=['test-slug'])
+        self.assertEqual(
+            post.text_html,
+            f'Привет, <a href="{profile}">@author</a> и @nobody! '
+            f'<a href="{group}">#test-slug</a> #missing'
+        )
+        self.author_client.post(
+            reverse('add_comment', args=['author', post.id]),
+            data={'text': '**Да**'})
+        self.assertEqual(
+            Comment.objects.get().text_html, '<strong>Да</strong>')
+        response = self.client.get(reverse('post', args=['author', post.id]))
+        self.assertContains(response, f'<a href="{group}">#test-slug</a>')
+
+    def test_backfill_renders_missing_html(self):
+        post = Post.objects.create(text='*старый*', author=self.author)
+        Post.objects.filter(id=post.id).update(text_html='')
+        out = StringIO()
+        call_command('render_texts', stdout=out)
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<em>старый</em>')
+        self.assertIn('Обработано постов: 1', out.getvalue())
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.moderation import (delete_posts, soft_delete_comment,
+                              soft_delete_post)
+from posts.models import Comment, Mention, Post, User
+from posts.settings import PAGE_SIZE
+
+MENTIONS = reverse('mentions')
+SPOOL_DIR = tempfile.mkdtemp()
+
+
+@override_settings(WRITE_BEHIND_SPOOL_DIR=SPOOL_DIR)
+class MentionsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_mentions_follow_saves(self):
+        """Упоминания пишутся при сохранении и пересобираются при правке."""
+        post = Post.objects.create(
+            text='Привет, @reader и @nobody и @author', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.author, text='@reader, ответь')
+        self.assertEqual(
+            list(Mention.objects.values_list('user', 'post', 'comment')),
+            [(self.reader.id, post.id, comment.id),
+             (self.reader.id, post.id, None)]
+        )
+        post.text = 'Без упоминаний'
+        post.save()
+        self.assertEqual(
+            list(Mention.objects.values_list('comment', flat=True)),
+            [comment.id]
+        )
+
+    @override_settings(WRITE_BEHIND=True)
+    def test_write_behind_comments_are_indexed(self):
+        post = Post.objects.create(text='Пост', author=self.reader)
+        author_client = Client()
+        author_client.force_login(self.author)
+        author_client.post(
+            reverse('add_comment', args=['reader', post.id]),
+            data={'text': 'Да, @reader'})
+        call_command('flush_writes')
+        mention = Mention.objects.get()
+        self.assertEqual(mention.comment, Comment.objects.get())
+
+    def test_feed_pages_by_cursor(self):
+        """Лента упоминаний листается курсором одним запросом."""
+        posts = [
+            Post.objects.create(text=f'@reader {index}', author=self.author)
+            for index in range(PAGE_SIZE + 2)
+        ]
+        response = self.reader_client.get(MENTIONS)
+        self.assertEqual(
+            [mention.post for mention in response.context['mentions']],
+            posts[::-1][:PAGE_SIZE]
+        )
+        cursor = response.context['next_cursor']
+        with self.assertNumQueries(4):
+            response = self.reader_client.get(MENTIONS, {'cursor': cursor})
+        self.assertEqual(
+            [mention.post for mention in response.context['mentions']],
+            posts[::-1][PAGE_SIZE:]
+        )
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.reader_client.get(MENTIONS, {'cursor': 'мусор'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unchanged_text_is_not_reindexed(self):
+        """Сохранение без правки текста не трогает упоминания."""
+        post = Post.objects.create(text='@reader', author=self.author)
+        mention = Mention.objects.get()
+        post.save()
+        self.assertEqual(Mention.objects.get(), mention)
+        post.text = '@reader снова'
+        post.save()
+        self.assertNotEqual(Mention.objects.get(), mention)
+
+    def test_deleted_posts_leave_no_mentions(self):
+        post = Post.objects.create(text='@reader', author=self.author)
+        Comment.objects.create(post=post, author=self.author, text='@reader')
+        delete_posts(Post.objects.filter(pk=post.pk))
+        self.assertFalse(Mention.objects.exists())
+        response = self.reader_client.get(MENTIONS)
+        self.assertEqual(list(response.context['mentions']), [])
+
+    def test_soft_deleted_mentions_stay_hidden(self):
+        """Пересчет текстов не возвращает упоминания удаленных записей."""
+        post = Post.objects.create(text='@reader', author=self.author)
+        other = Post.objects.create(text='Пост', author=self.author)
+        comment = Comment.objects.create(
+            post=other, author=self.author, text='@reader')
+        soft_delete_post(post)
+        soft_delete_comment(comment)
+        call_command('render_texts', '--all', stdout=StringIO())
+        self.assertFalse(Mention.objects.exists())
+        Mention.objects.create(
+            user=self.reader, author=self.author, post=post,
+            created=post.pub_date)
+        Mention.objects.create(
+            user=self.reader, author=self.author, post=other,
+            comment=comment, created=comment.created)
+        response = self.reader_client.get(MENTIONS)
+        self.assertEqual(list(response.context['mentions']), [])
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import write_behind
+from posts.models import (Inbox, Notification, NotificationEvent, Post,
+                          User)
+
+NOTIFICATIONS = reverse('notifications')
+SPOOL_DIR = tempfile.mkdtemp()
+
+
+@override_settings(WRITE_BEHIND_SPOOL_DIR=SPOOL_DIR)
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.another = User.objects.create_user(username='another')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.ADD_COMMENT = reverse('add_comment', args=['author', cls.post.id])
+        cls.FOLLOW = reverse('profile_follow', args=['author'])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.clients = {}
+        for user in (self.author, self.reader, self.another):
+            self.clients[user] = Client()
+            self.clients[user].force_login(user)
+
+    def unread(self):
+        return Inbox.objects.get(user=self.author).unread
+
+    def test_events_are_coalesced(self):
+        """Комментарии к посту складываются в одно уведомление."""
+        for user in (self.reader, self.another, self.reader):
+            self.clients[user].post(self.ADD_COMMENT, data={'text': 'Да'})
+        self.clients[self.author].post(self.ADD_COMMENT, data={'text': 'Я'})
+        self.clients[self.reader].get(self.FOLLOW)
+        call_command('flush_writes')
+        comments = Notification.objects.get(kind=Notification.COMMENT)
+        self.assertEqual(comments.recipient, self.author)
+        self.assertEqual(comments.post, self.post)
+        self.assertEqual(comments.count, 3)
+        self.assertEqual(comments.actor, self.reader)
+        self.assertEqual(
+            Notification.objects.get(kind=Notification.FOLLOW).count, 1)
+        self.assertEqual(self.unread(), 2)
+        self.clients[self.another].post(self.ADD_COMMENT, data={'text': 'Еще'})
+        call_command('flush_writes')
+        comments.refresh_from_db()
+        self.assertEqual(comments.count, 4)
+        self.assertEqual(self.unread(), 2)
+
+    def test_notifications_are_queued(self):
+        """Запрос только ставит событие в очередь, доставляет сброс."""
+        self.clients[self.reader].post(self.ADD_COMMENT, data={'text': 'Да'})
+        self.assertFalse(os.path.exists(
+            write_behind.spool_path(write_behind.PENDING)))
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationEvent.objects.count(), 1)
+        call_command('flush_writes')
+        self.assertFalse(NotificationEvent.objects.exists())
+        self.assertEqual(self.unread(), 1)
+
+    @override_settings(NOTIFY_INLINE=True)
+    def test_inline_delivery_is_opt_in(self):
+        self.clients[self.reader].post(self.ADD_COMMENT, data={'text': 'Да'})
+        self.assertFalse(NotificationEvent.objects.exists())
+        self.assertEqual(self.unread(), 1)
+
+    @override_settings(WRITE_BEHIND=True)
+    def test_write_behind_comments_notify(self):
+        self.clients[self.reader].post(self.ADD_COMMENT, data={'text': 'Да'})
+        self.clients[self.reader].get(self.FOLLOW)
+        call_command('flush_writes')
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(self.unread(), 2)
+
+    def test_inbox_marks_notifications_read(self):
+        """Страница уведомлений читает срез и обнуляет счетчик."""
+        self.clients[self.reader].post(self.ADD_COMMENT, data={'text': 'Да'})
+        call_command('flush_writes')
+        response = self.clients[self.author].get(NOTIFICATIONS)
+        self.assertEqual(len(response.context['notifications']), 1)
+        self.assertTrue(response.context['notifications'][0].unread)
+        self.assertEqual(self.unread(), 0)
+        self.assertFalse(Notification.objects.filter(unread=True).exists())
+        self.clients[self.another].post(self.ADD_COMMENT, data={'text': 'Да'})
+        call_command('flush_writes')
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(self.unread(), 1)
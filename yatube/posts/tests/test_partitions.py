@@ -0,0 +1,69 @@
+from datetime import date, datetime
+
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from posts import partitions
+from posts.models import Comment, Post, User
+
+
+class PartitionsTest(TestCase):
+    def test_months(self):
+        self.assertEqual(
+            list(partitions.month_range(date(2026, 11, 15), date(2027, 1, 1))),
+            [date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)]
+        )
+        self.assertEqual(
+            partitions.partition_name(date(2027, 1, 1)),
+            'posts_comment_y2027m01'
+        )
+
+    def test_other_databases_are_left_alone(self):
+        """Без PostgreSQL секции не создаются и команда ничего не делает."""
+        if partitions.supported(partitions.default_connection):
+            self.skipTest('Проверка для баз без секционирования')
+        self.assertEqual(partitions.ensure_partitions(), [])
+        call_command('create_partitions')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Нужен PostgreSQL')
+class PostgresPartitionsTest(TestCase):
+    def partition_of(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT tableoid::regclass::text FROM posts_comment '
+                'WHERE id = %s', [comment.pk])
+            return cursor.fetchone()[0]
+
+    def test_comments_are_partitioned(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT partrelid::regclass::text FROM pg_partitioned_table')
+            tables = {name for name, in cursor.fetchall()}
+        self.assertIn(partitions.TABLE, tables)
+        partitions.ensure_partitions()
+        self.assertEqual(partitions.ensure_partitions(), [])
+
+    def test_rows_in_default_move_to_new_partition(self):
+        """Строки месяца без секции переезжают из DEFAULT в его секцию."""
+        month = date(2099, 5, 1)
+        author = User.objects.create_user(username='author')
+        comment = Comment.objects.create(
+            post=Post.objects.create(text='Пост', author=author),
+            author=author,
+            text='Комментарий'
+        )
+        Comment.all_objects.filter(pk=comment.pk).update(
+            created=timezone.make_aware(datetime(2099, 5, 15)))
+        self.assertEqual(
+            self.partition_of(comment), partitions.default_partition())
+        self.assertEqual(
+            partitions.ensure_partitions(months_ahead=0, today=month),
+            [partitions.partition_name(month)]
+        )
+        self.assertEqual(
+            self.partition_of(comment), partitions.partition_name(month))
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import ratelimit
+
+USERNAME = 'testuser'
+ANOTHER_USERNAME = 'another'
+FOLLOW = reverse(
+    'profile_follow',
+    kwargs={'username': ANOTHER_USERNAME}
+)
+INDEX = reverse('index')
+# Двадцать секунд от начала минутного окна.
+NOW = 60 * 1000 + 20.0
+
+
+@override_settings(RATELIMITS={
+    'add_comment': ('2/m', ('POST',)),
+    'profile_follow': ('1/h', ('GET',)),
+})
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        User.objects.create_user(username=ANOTHER_USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        cls.ADD_COMMENT = reverse(
+            'add_comment',
+            kwargs={'username': USERNAME, 'post_id': cls.post.id}
+        )
+
+    def setUp(self):
+        cache.clear()
+        clock = mock.patch.object(ratelimit, 'time')
+        clock.start().time.return_value = NOW
+        self.addCleanup(clock.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_comments_are_limited(self):
+        """После исчерпания корзины возвращается 429 с Retry-After."""
+        for _ in range(2):
+            response = self.authorized_client.post(
+                self.ADD_COMMENT, {'text': 'Комментарий'})
+            self.assertEqual(response.status_code, 302)
+        rejected_before = ratelimit.rejected().get('add_comment', 0)
+        response = self.authorized_client.post(
+            self.ADD_COMMENT, {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '40')
+        self.assertEqual(self.post.comments.count(), 2)
+        self.assertEqual(
+            ratelimit.rejected()['add_comment'], rejected_before + 1)
+
+    def test_other_methods_and_views_are_not_limited(self):
+        """Ограничение действует только на указанные методы и URL."""
+        self.authorized_client.get(FOLLOW)
+        self.assertEqual(self.authorized_client.get(FOLLOW).status_code, 429)
+        for _ in range(3):
+            self.assertNotEqual(
+                self.authorized_client.get(self.ADD_COMMENT).status_code,
+                429
+            )
+            response = self.authorized_client.get(INDEX)
+            self.assertEqual(response.status_code, 200)
+
+    def test_rejected_request_does_not_spend_other_counters(self):
+        """Запрос, отклоненный лимитом пользователя, не тратит лимит IP."""
+        keys = ['ratelimit:test:ip', 'ratelimit:test:user']
+        self.assertEqual(ratelimit.take_tokens(keys[1:], 1, 60), 0)
+        self.assertNotEqual(ratelimit.take_tokens(keys, 1, 60), 0)
+        self.assertEqual(ratelimit.take_tokens(keys[:1], 1, 60), 0)
+
+    @override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_client_ip_comes_from_proxy_header(self):
+        """Адрес клиента берется из заголовка доверенного прокси."""
+        request = RequestFactory().get(
+            INDEX, HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.2')
+        self.assertEqual(ratelimit.client_ip(request), '10.0.0.2')
+        with self.settings(RATELIMIT_IP_HEADER=None):
+            self.assertEqual(ratelimit.client_ip(request), '127.0.0.1')
+
+    def test_local_counters_are_bounded(self):
+        """Без кэша счетчики в памяти не растут бесконечно."""
+        with mock.patch.object(ratelimit, 'cache') as broken, \
+                mock.patch.object(ratelimit, 'LOCAL_MAX_KEYS', 3):
+            broken.get_many.side_effect = ConnectionError
+            broken.add.side_effect = ConnectionError
+            for index in range(5):
+                ratelimit.take_tokens([f'ratelimit:test:{index}'], 1, 60)
+            self.assertGreater(
+                ratelimit.take_tokens(['ratelimit:test:4'], 1, 60), 0)
+            self.assertEqual(len(ratelimit._local_counters), 3)
+        ratelimit._local_counters.clear()
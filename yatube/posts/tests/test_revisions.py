@@ -0,0 +1,68 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, PostRevision, User
+from posts.revisions import apply_diff, reverse_diff
+
+TEXTS = (
+    'Первая версия поста',
+    'Первая исправленная версия поста',
+    'Совсем другой текст',
+)
+
+
+class RevisionsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def setUp(self):
+        self.post = Post.objects.create(text=TEXTS[0], author=self.author)
+        self.POST_EDIT = reverse('post_edit', args=['author', self.post.id])
+        self.POST_HISTORY = reverse(
+            'post_history', args=['author', self.post.id])
+
+    def test_reverse_diff_restores_previous_text(self):
+        for new, old in zip(TEXTS[1:], TEXTS):
+            self.assertEqual(apply_diff(new, reverse_diff(new, old)), old)
+
+    def test_edits_keep_compact_history(self):
+        """Правки сохраняют диффы, страница истории собирает версии."""
+        for text in TEXTS[1:]:
+            self.author_client.post(self.POST_EDIT, data={'text': text})
+        self.post.refresh_from_db()
+        self.post.save()
+        self.assertEqual(PostRevision.objects.count(), 2)
+        small_edit = PostRevision.objects.order_by('created', 'id').first()
+        self.assertNotIn(TEXTS[0], small_edit.diff)
+        self.assertLess(
+            len(json.dumps(json.loads(small_edit.diff))), len(TEXTS[0]))
+        response = self.client.get(self.POST_HISTORY)
+        self.assertEqual(
+            [version['text'] for version in response.context['versions']],
+            list(reversed(TEXTS))
+        )
+
+    def test_prune_removes_oldest_revisions(self):
+        for text in TEXTS[1:]:
+            self.author_client.post(self.POST_EDIT, data={'text': text})
+        oldest = PostRevision.objects.order_by('created', 'id').first()
+        PostRevision.objects.filter(id=oldest.id).update(
+            created=timezone.now() - timedelta(days=365))
+        out = StringIO()
+        call_command('prune_revisions', stdout=out)
+        self.assertIn('Удалено версий: 1', out.getvalue())
+        response = self.client.get(self.POST_HISTORY)
+        self.assertEqual(
+            [version['text'] for version in response.context['versions']],
+            [TEXTS[2], TEXTS[1]]
+        )
@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+from yatube import jinja2_env, warmup
+
+INDEX = reverse('index')
+FOLLOW_INDEX = reverse('follow_index')
+USERNAME = 'testuser'
+GROUP_SLUG = 'test-slug'
+PROFILE = reverse('profile', kwargs={'username': USERNAME})
+GROUP_POSTS = reverse('group_posts', kwargs={'slug': GROUP_SLUG})
+FEED_TEMPLATES = {
+    'index.html', 'group.html', 'profile.html', 'follow.html', 'post.html'}
+
+
+class WarmTemplatesTest(TestCase):
+    def test_templates_are_cached(self):
+        """Команда прогрева загружает шаблоны в кэш загрузчика."""
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        call_command('warm_templates', stdout=StringIO())
+        for name in ['index.html', 'post_item.html', 'signup.html']:
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
+
+    def test_only_project_templates_are_warmed(self):
+        """Шаблоны admin не прогреваются, ошибка шаблона не роняет запуск."""
+        engine = engines['django'].engine
+        names = warmup.template_names(engine)
+        self.assertIn('index.html', names)
+        self.assertNotIn('admin/base.html', names)
+        with mock.patch.object(
+                warmup, 'template_names',
+                return_value=['index.html', 'missing.html']), \
+                self.assertLogs('yatube.warmup', 'ERROR') as logs:
+            self.assertEqual(warmup.warm_templates(), ['index.html'])
+        self.assertIn('missing.html', logs.output[0])
+
+    def test_bench_reports_render_time(self):
+        """Бенчмарк не очищает общий кэш."""
+        cache.set('ratelimit:test', 1)
+        out = StringIO()
+        call_command(
+            'bench_templates', cards=[2], iterations=1, stdout=out)
+        self.assertIn('Jinja2', out.getvalue())
+        self.assertEqual(cache.get('ratelimit:test'), 1)
+
+
+@override_settings(JINJA2_TEMPLATES=FEED_TEMPLATES)
+class Jinja2TemplatesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Мария', last_name='Иванова')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', description='Описание', slug=GROUP_SLUG)
+        cls.post = Post.objects.create(
+            text='Пост для Jinja2', author=cls.user, group=cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.VIEW_POST = reverse(
+            'post', kwargs={'username': USERNAME, 'post_id': cls.post.id})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_pages(self):
+        """Лента, группа, профиль и пост рендерятся движком Jinja2."""
+        for url in [INDEX, GROUP_POSTS, PROFILE, FOLLOW_INDEX, self.VIEW_POST]:
+            with self.subTest(url=url):
+                response = self.reader_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Пост для Jinja2')
+                self.assertContains(response, self.VIEW_POST)
+                self.assertContains(response, 'Выйти')
+
+    def test_thumbnail_error_does_not_break_page(self):
+        """Ошибка миниатюры не ломает страницу, как и в шаблонах Django."""
+        Post.objects.filter(pk=self.post.pk).update(image='posts/broken.jpg')
+        with mock.patch.object(
+                jinja2_env, 'get_thumbnail', side_effect=ValueError), \
+                self.assertLogs('sorl.thumbnail', 'ERROR'):
+            response = self.reader_client.get(self.VIEW_POST)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Пост для Jinja2')
+
+    def test_post_page_has_comment_form(self):
+        response = self.reader_client.get(self.VIEW_POST)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertContains(response, 'form-control')
+        self.assertContains(response, 'Мария Иванова')
@@ -0,0 +1,61 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import (Comment, Follow, Group, Post, Trend,
+                          TrendEvent, User)
+
+TRENDING = reverse('trending')
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+
+    def test_scores_follow_events(self):
+        """Комментарии и подписки поднимают пост и группу при пересчете."""
+        quiet = Post.objects.create(text='Тихий', author=self.reader)
+        popular = Post.objects.create(
+            text='Обсуждаемый', author=self.author, group=self.group)
+        for _ in range(2):
+            Comment.objects.create(post=popular, author=self.reader)
+        Follow.objects.create(user=self.reader, author=self.author)
+        popular.refresh_from_db()
+        self.assertEqual(popular.trend_score, 0)
+        call_command('refresh_trending')
+        self.assertFalse(TrendEvent.objects.exists())
+        popular.refresh_from_db()
+        quiet.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(quiet.trend_score, trending.POST_WEIGHT)
+        self.assertEqual(popular.trend_score, (
+            trending.POST_WEIGHT + 2 * trending.COMMENT_WEIGHT
+            + trending.FOLLOW_WEIGHT))
+        self.assertEqual(
+            self.group.trend_score,
+            trending.POST_WEIGHT + 2 * trending.COMMENT_WEIGHT)
+        with self.assertNumQueries(1):
+            posts, groups = trending.trending()
+        self.assertEqual(posts, [popular, quiet])
+        self.assertEqual(groups, [self.group])
+        response = self.client.get(TRENDING)
+        self.assertEqual(list(response.context['posts']), [popular, quiet])
+
+    def test_refresh_decays_scores(self):
+        post = Post.objects.create(text='Пост', author=self.author)
+        now = timezone.now()
+        trending.refresh(now)
+        trending.refresh(now + 2 * trending.TREND_HALF_LIFE)
+        post.refresh_from_db()
+        self.assertAlmostEqual(post.trend_score, trending.POST_WEIGHT / 4)
+        trending.refresh(now + 20 * trending.TREND_HALF_LIFE)
+        post.refresh_from_db()
+        self.assertEqual(post.trend_score, 0)
+        self.assertFalse(Trend.objects.exists())
@@ -3,6 +3,8 @@ import shutil
 from django.core.cache import cache
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.test import Client, TestCase
 
@@ -269,3 +271,96 @@ class FollowViewsTest(TestCase):
     def test_new_post_doesnt_shown_to_follower(self):
         response = self.authorized_client.get(FOLLOW_INDEX)
         self.assertNotIn(self.post, response.context['page'])
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа',
+            description=DESCRIPTION,
+            slug=GROUP_WITH_POST_SLAG
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(url)
+        return len(context)
+
+    def test_feed_queries_do_not_grow_with_page(self):
+        """Число запросов ленты не зависит от числа постов на странице."""
+        urls = [INDEX, GROUP_WITH_POSTS, FOLLOW_INDEX]
+        another_author = User.objects.create_user(username=ANOTHER_USERNAME)
+        Follow.objects.create(user=self.user, author=another_author)
+        Post.objects.create(
+            text='Первый пост',
+            author=another_author,
+            group=self.group
+        )
+        queries_before = {url: self.count_queries(url) for url in urls}
+        for index in range(PAGE_SIZE):
+            author = User.objects.create_user(username=f'author{index}')
+            Follow.objects.create(user=self.user, author=author)
+            Post.objects.create(
+                text=f'Пост номер {index}',
+                author=author,
+                group=self.group
+            )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url),
+                    queries_before[url]
+                )
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.another_user = User.objects.create_user(username=ANOTHER_USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.another_user)
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user
+        )
+        Post.objects.create(text='Еще один пост', author=cls.user)
+        Follow.objects.create(user=cls.another_user, author=cls.user)
+        cls.VIEW_POST = reverse(
+            'post',
+            kwargs={
+                'username': cls.user.username,
+                'post_id': cls.post.id
+            }
+        )
+
+    def test_author_stats_in_context(self):
+        """Счетчики автора и подписка передаются в контекст."""
+        for url in [self.VIEW_POST, PROFILE]:
+            with self.subTest(url=url):
+                context = self.authorized_client.get(url).context
+                author = context['author']
+                self.assertEqual(author.posts_count, 2)
+                self.assertEqual(author.followers_count, 1)
+                self.assertEqual(author.following_count, 0)
+                self.assertTrue(context['is_following'])
+
+    def test_author_stats_for_guest(self):
+        """Гость не подписан на автора."""
+        for url in [self.VIEW_POST, PROFILE]:
+            with self.subTest(url=url):
+                context = self.client.get(url).context
+                self.assertFalse(context['is_following'])
+                self.assertEqual(context['author'].followers_count, 1)
+
+    def test_post_view_queries(self):
+        """Пост, счетчики автора и комментарии читаются двумя запросами."""
+        with self.assertNumQueries(2):
+            self.client.get(self.VIEW_POST)
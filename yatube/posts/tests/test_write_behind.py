@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import write_behind
+from posts.models import Comment, Follow, Post, User
+
+USERNAME = 'testuser'
+ANOTHER_USERNAME = 'another'
+COMMENT_TEXT = 'Отложенный комментарий'
+FOLLOW = reverse(
+    'profile_follow',
+    kwargs={'username': ANOTHER_USERNAME}
+)
+UNFOLLOW = reverse(
+    'profile_unfollow',
+    kwargs={'username': ANOTHER_USERNAME}
+)
+SPOOL_DIR = tempfile.mkdtemp()
+
+
+@override_settings(WRITE_BEHIND=True, WRITE_BEHIND_SPOOL_DIR=SPOOL_DIR)
+class WriteBehindTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.another_user = User.objects.create_user(username=ANOTHER_USERNAME)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.another_user
+        )
+        cls.ADD_COMMENT = reverse(
+            'add_comment',
+            kwargs={
+                'username': ANOTHER_USERNAME,
+                'post_id': cls.post.id
+            }
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_comment_is_written_on_flush(self):
+        """Комментарий появляется в базе только после сброса журнала."""
+        response = self.authorized_client.post(
+            self.ADD_COMMENT,
+            data={'text': COMMENT_TEXT}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Comment.objects.exists())
+        call_command('flush_writes')
+        comment = Comment.objects.get()
+        self.assertEqual(comment.text, COMMENT_TEXT)
+        self.assertEqual(comment.author, self.user)
+        self.assertEqual(comment.post, self.post)
+
+    def test_follows_keep_user_order(self):
+        """Подписки применяются в порядке действий пользователя."""
+        self.authorized_client.get(FOLLOW)
+        self.authorized_client.get(UNFOLLOW)
+        self.authorized_client.get(FOLLOW)
+        call_command('flush_writes')
+        self.assertEqual(Follow.objects.filter(
+            user=self.user, author=self.another_user).count(), 1)
+        self.authorized_client.get(UNFOLLOW)
+        call_command('flush_writes')
+        self.assertFalse(Follow.objects.exists())
+
+    def test_failing_entry_goes_to_dead_letters(self):
+        """Ошибочная операция откладывается и не блокирует остальные."""
+        broken = {'action': write_behind.COMMENT, 'user': self.user.pk,
+                  'post_id': self.post.pk}
+        write_behind.append_lines(
+            write_behind.spool_path(write_behind.PENDING),
+            [json.dumps(broken)]
+        )
+        self.authorized_client.post(
+            self.ADD_COMMENT,
+            data={'text': COMMENT_TEXT}
+        )
+        self.assertEqual(write_behind.flush(), 1)
+        self.assertEqual(Comment.objects.get().text, COMMENT_TEXT)
+        dead = write_behind.read_entries(
+            write_behind.spool_path(write_behind.DEAD))
+        os.remove(write_behind.spool_path(write_behind.DEAD))
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0]['post_id'], self.post.pk)
+        self.assertIn('KeyError', dead[0]['error'])
+
+    def test_overlapping_flush_is_skipped(self):
+        """Пока идет один сброс, второй ничего не применяет."""
+        self.authorized_client.post(
+            self.ADD_COMMENT,
+            data={'text': COMMENT_TEXT}
+        )
+        with write_behind.flush_lock():
+            self.assertEqual(write_behind.flush(), 0)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(write_behind.flush(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_torn_line_goes_to_dead_letters(self):
+        """Оборванная строка журнала не останавливает сброс."""
+        with open(write_behind.spool_path(write_behind.PENDING), 'w') as spool:
+            spool.write('{"action": "comment", "us')
+        self.authorized_client.post(
+            self.ADD_COMMENT,
+            data={'text': COMMENT_TEXT}
+        )
+        self.assertEqual(write_behind.flush(), 1)
+        self.assertEqual(Comment.objects.get().text, COMMENT_TEXT)
+        dead = write_behind.read_entries(
+            write_behind.spool_path(write_behind.DEAD))
+        os.remove(write_behind.spool_path(write_behind.DEAD))
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0]['line'], '{"action": "comment", "us')
+        self.assertIn('JSONDecodeError', dead[0]['error'])
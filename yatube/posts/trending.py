@@ -0,0 +1,128 @@
+"""
+Популярные посты и группы.
+
+Очки поста растут на каждый новый комментарий и на каждого нового
+подписчика автора (для его свежих постов), очки группы складываются
+из очков ее постов. События не обновляют строки постов и групп, а
+только дописываются в TrendEvent. Периодическая команда
+refresh_trending умножает очки на 2 ** (-прошедшее время /
+TREND_HALF_LIFE) пачками по id, прибавляет накопленные события и
+пересобирает таблицу Trend из TOP_K лучших постов и групп. Страница
+популярного читает эту таблицу одним запросом.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from .models import Group, Post, Trend, TrendEvent
+from .moderation import id_chunks
+
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+FOLLOW_WEIGHT = 2.0
+FOLLOW_WINDOW = timedelta(days=1)
+TREND_HALF_LIFE = timedelta(hours=6)
+MIN_SCORE = 0.01
+TOP_K = 50
+
+
+def add_scores(model, weights):
+    """Прибавляет веса к очкам, одним запросом на каждый вес."""
+    ids_by_weight = defaultdict(list)
+    for pk, weight in weights.items():
+        ids_by_weight[weight].append(pk)
+    for weight, ids in ids_by_weight.items():
+        model.objects.filter(pk__in=ids).update(
+            trend_score=F('trend_score') + weight)
+
+
+def record_post(post):
+    """Учитывает новый пост."""
+    TrendEvent.objects.create(post_id=post.pk, weight=POST_WEIGHT)
+
+
+def record_comments(post_ids):
+    """Учитывает новые комментарии к постам с переданными id."""
+    TrendEvent.objects.bulk_create([
+        TrendEvent(post_id=pk, weight=count * COMMENT_WEIGHT)
+        for pk, count in Counter(post_ids).items()
+    ])
+
+
+def record_follows(author_ids):
+    """Учитывает новых подписчиков авторов в очках их свежих постов."""
+    follows = Counter(author_ids)
+    if not follows:
+        return
+    since = timezone.now() - FOLLOW_WINDOW
+    TrendEvent.objects.bulk_create([
+        TrendEvent(post_id=pk, weight=follows[author] * FOLLOW_WEIGHT,
+                   grouped=False)
+        for pk, author in Post.objects.filter(
+            author__in=follows, pub_date__gte=since
+        ).values_list('pk', 'author')
+    ])
+
+
+def apply_events(events):
+    """Прибавляет накопленные события к очкам постов и групп."""
+    add_scores(Post, dict(events.values('post').annotate(
+        total=Sum('weight')).values_list('post', 'total')))
+    add_scores(Group, dict(events.filter(
+        grouped=True, post__group__isnull=False
+    ).values('post__group').annotate(
+        total=Sum('weight')).values_list('post__group', 'total')))
+    events.delete()
+
+
+def decay(factor):
+    """Умножает очки на factor пачками, обнуляя совсем малые."""
+    for model in (Post, Group):
+        for chunk in id_chunks(model.objects.filter(trend_score__gt=0)):
+            with transaction.atomic():
+                scored = model.objects.filter(pk__in=chunk)
+                scored.update(trend_score=F('trend_score') * factor)
+                scored.filter(trend_score__lt=MIN_SCORE).update(
+                    trend_score=0)
+
+
+def refresh(now=None):
+    """Применяет затухание и события и пересобирает популярное."""
+    now = now or timezone.now()
+    last = Trend.objects.aggregate(last=Max('refreshed'))['last']
+    if last is not None and now > last:
+        decay(0.5 ** ((now - last) / TREND_HALF_LIFE))
+    with transaction.atomic():
+        newest = TrendEvent.objects.aggregate(newest=Max('pk'))['newest']
+        if newest is not None:
+            apply_events(TrendEvent.objects.filter(pk__lte=newest))
+        Trend.objects.all().delete()
+        Trend.objects.bulk_create([
+            Trend(kind=Trend.POST, rank=rank, score=score, post_id=pk,
+                  refreshed=now)
+            for rank, (pk, score) in enumerate(Post.objects.filter(
+                trend_score__gt=0
+            ).order_by('-trend_score').values_list(
+                'pk', 'trend_score')[:TOP_K], 1)
+        ] + [
+            Trend(kind=Trend.GROUP, rank=rank, score=score, group_id=pk,
+                  refreshed=now)
+            for rank, (pk, score) in enumerate(Group.objects.filter(
+                trend_score__gt=0
+            ).order_by('-trend_score').values_list(
+                'pk', 'trend_score')[:TOP_K], 1)
+        ])
+
+
+def trending():
+    """Популярные посты и группы из таблицы Trend."""
+    trends = {Trend.POST: [], Trend.GROUP: []}
+    for trend in Trend.objects.select_related(
+        'post__author', 'post__group', 'group'
+    ):
+        trends[trend.kind].append(trend.post or trend.group)
+    return trends[Trend.POST], trends[Trend.GROUP]
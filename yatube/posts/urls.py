@@ -1,8 +1,44 @@
 from django.urls import path
 
-from . import views
+from . import events, feeds, views
 
 urlpatterns = [
+    path(
+        'events/',
+        events.post_events,
+        name='post_events'),
+    path(
+        'feeds/rss/',
+        feeds.posts_rss,
+        name='posts_rss'),
+    path(
+        'feeds/atom/',
+        feeds.posts_atom,
+        name='posts_atom'),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.group_rss,
+        name='group_rss'),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.group_atom,
+        name='group_atom'),
+    path(
+        '<str:username>/rss/',
+        feeds.author_rss,
+        name='author_rss'),
+    path(
+        '<str:username>/atom/',
+        feeds.author_atom,
+        name='author_atom'),
+    path(
+        'mentions/',
+        views.mentions_feed,
+        name='mentions'),
+    path(
+        'notifications/',
+        views.notifications,
+        name='notifications'),
     path(
         'follow/',
         views.follow_index,
@@ -19,6 +55,14 @@ urlpatterns = [
         'new/',
         views.new_post,
         name='new_post'),
+    path(
+        'trending/',
+        views.trending_posts,
+        name='trending'),
+    path(
+        'groups/',
+        views.groups,
+        name='groups'),
     path(
         'group/<slug:slug>/',
         views.group_posts,
@@ -35,10 +79,26 @@ urlpatterns = [
         '<str:username>/<int:post_id>/edit/',
         views.post_edit,
         name='post_edit'),
+    path(
+        '<str:username>/<int:post_id>/like/',
+        views.post_like,
+        name='post_like'),
+    path(
+        '<str:username>/<int:post_id>/history/',
+        views.post_history,
+        name='post_history'),
+    path(
+        '<str:username>/<int:post_id>/delete/',
+        views.post_delete,
+        name='post_delete'),
     path(
         '<str:username>/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'),
+    path(
+        '<str:username>/<int:post_id>/comment/<int:comment_id>/delete/',
+        views.comment_delete,
+        name='comment_delete'),
     path(
         '',
         views.index,
@@ -1,14 +1,32 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, redirect, render
+from django.db.models import F, Q
+from django.http import HttpResponseBadRequest
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_POST
 
+from .api import BadRequest, decode_cursor, encode_cursor
 from .forms import CommentForm, PostForm
-from .models import User, Follow, Group, Post
+from .likes import like_counts, liked, likes_count, toggle_like
+from .models import (User, Comment, Follow, Group, Mention, Notification,
+                     Post)
+from .moderation import soft_delete_comment, soft_delete_post
+from .notifications import event, inbox, notify
+from .queries import author_stats, copy_author_stats
+from .rendering import render
 from .settings import PAGE_SIZE
+from . import revisions, trending, write_behind
+
+GROUP_ORDERINGS = {
+    'activity': (F('last_post_date').desc(nulls_last=True), 'title'),
+    'posts': ('-posts_count', 'title'),
+}
 
 
 def index(request):
-    latest = Post.objects.all()
+    latest = Post.objects.hot().select_related('author', 'group').annotate(
+        likes_count=likes_count())
     paginator = Paginator(latest, PAGE_SIZE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
@@ -17,13 +35,37 @@ def index(request):
 
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.hot().select_related('author').annotate(
+        likes_count=likes_count())
     paginator = Paginator(posts, PAGE_SIZE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
     return render(request, "group.html", {"group": group, "page": page})
 
 
+def groups(request):
+    ordering = GROUP_ORDERINGS.get(
+        request.GET.get('sort'), GROUP_ORDERINGS['activity'])
+    paginator = Paginator(Group.objects.order_by(*ordering), PAGE_SIZE)
+    page_number = request.GET.get('page')
+    page = paginator.get_page(page_number)
+    return render(request, 'groups.html', {
+        'page': page,
+        'sort': request.GET.get('sort', 'activity')
+    })
+
+
+def trending_posts(request):
+    posts, groups = trending.trending()
+    counts = like_counts([post.id for post in posts])
+    for post in posts:
+        post.likes_count = counts.get(post.id, 0)
+    return render(request, 'trending.html', {
+        'posts': posts,
+        'groups': groups
+    })
+
+
 @login_required
 def new_post(request):
     form = PostForm(
@@ -42,44 +84,43 @@ def new_post(request):
 
 
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = get_object_or_404(
+        User.objects.annotate(**author_stats(request.user)),
+        username=username
+    )
+    posts = author.posts.select_related('group').annotate(
+        likes_count=likes_count())
     paginator = Paginator(posts, PAGE_SIZE)
+    paginator.count = author.posts_count
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    is_following = (request.user != author
-                    and request.user.is_authenticated
-                    and Follow.objects.filter(
-                        user=request.user,
-                        author=author
-                    ).exists())
     return render(request, 'profile.html', {
         'author': author,
         'page': page,
-        'is_following': is_following
+        'is_following': author.is_following
     })
 
 
 def post_view(request, username, post_id):
     post = get_object_or_404(
-        Post,
+        Post.objects.select_related('author', 'group').annotate(
+            likes_count=likes_count(),
+            liked=liked(request.user),
+            **author_stats(request.user, 'author')
+        ),
         author__username=username,
         id=post_id
     )
-    comments = post.comments.all()
+    comments = post.comments.filter(
+        created__gte=post.pub_date
+    ).select_related('author')
     form = CommentForm(request.POST or None)
-    is_following = (request.user != post.author
-                    and request.user.is_authenticated
-                    and Follow.objects.filter(
-                        user=request.user,
-                        author=post.author
-                    ).exists())
     context = {
         'post': post,
-        'author': post.author,
+        'author': copy_author_stats(post),
         'form': form,
         'comments': comments,
-        'is_following': is_following
+        'is_following': post.is_following
     }
     return render(request, 'post.html', context)
 
@@ -104,6 +145,18 @@ def post_edit(request, username, post_id):
     return redirect('post', username, post_id)
 
 
+def post_history(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        author__username=username,
+        id=post_id
+    )
+    return render(request, 'post_history.html', {
+        'post': post,
+        'versions': revisions.history(post)
+    })
+
+
 def page_not_found(request, exception):
     return render(request, 'misc/404.html', {
         "path": request.path},
@@ -117,20 +170,34 @@ def server_error(request):
 
 @login_required
 def add_comment(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
+    if settings.WRITE_BEHIND:
+        if form.is_valid():
+            write_behind.enqueue(
+                write_behind.COMMENT,
+                request.user,
+                post_id=post_id,
+                text=form.cleaned_data['text']
+            )
+        return redirect('post', username=username, post_id=post_id)
+    post = get_object_or_404(Post, id=post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        notify([event(
+            Notification.COMMENT, post.author_id, request.user.id, post.id)])
     return redirect('post', username=username, post_id=post_id)
 
 
 @login_required
 def follow_index(request):
     username = request.user
-    post = Post.objects.filter(author__following__user=username)
+    post = Post.objects.hot().filter(
+        author__following__user=username
+    ).select_related('author', 'group').annotate(
+        likes_count=likes_count())
     paginator = Paginator(post, PAGE_SIZE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
@@ -140,22 +207,98 @@ def follow_index(request):
     )
 
 
+@login_required
+def mentions_feed(request):
+    mentions = Mention.objects.filter(
+        user=request.user,
+        post__deleted_at__isnull=True,
+        comment__deleted_at__isnull=True
+    ).select_related('author', 'post__author', 'comment')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            moment, pk = decode_cursor(cursor)
+        except BadRequest as error:
+            return HttpResponseBadRequest(str(error))
+        mentions = mentions.filter(
+            Q(created__lt=moment) | Q(created=moment, pk__lt=pk))
+    page = list(mentions.order_by('-created', '-pk')[:PAGE_SIZE + 1])
+    next_cursor = None
+    if len(page) > PAGE_SIZE:
+        last = page[PAGE_SIZE - 1]
+        next_cursor = encode_cursor(last.created, last.pk)
+    return render(request, 'mentions.html', {
+        'mentions': page[:PAGE_SIZE],
+        'next_cursor': next_cursor
+    })
+
+
 @login_required
 def profile_follow(request, username):
     if username != request.user.username:
+        if settings.WRITE_BEHIND:
+            write_behind.enqueue(
+                write_behind.FOLLOW, request.user, author=username)
+            return redirect('profile', username=username)
         author = get_object_or_404(User, username=username)
-        Follow.objects.get_or_create(
+        _, created = Follow.objects.get_or_create(
             user=request.user,
             author=author
         )
+        if created:
+            notify([event(Notification.FOLLOW, author.id, request.user.id)])
     return redirect('profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
+    if settings.WRITE_BEHIND:
+        write_behind.enqueue(
+            write_behind.UNFOLLOW, request.user, author=username)
+        return redirect('profile', username=username)
     get_object_or_404(
         Follow,
         user=request.user,
         author__username=username
     ).delete()
     return redirect('profile', username=username)
+
+
+@login_required
+def notifications(request):
+    return render(request, 'notifications.html', {
+        'notifications': inbox(request.user)
+    })
+
+
+@login_required
+@require_POST
+def post_like(request, username, post_id):
+    get_object_or_404(
+        Post.objects.only('id'), author__username=username, id=post_id)
+    toggle_like(request.user, post_id)
+    return redirect('post', username=username, post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_delete(request, username, post_id):
+    post = get_object_or_404(Post, author__username=username, id=post_id)
+    if post.author_id != request.user.id:
+        return redirect('post', username, post_id)
+    soft_delete_post(post)
+    return redirect('profile', username)
+
+
+@login_required
+@require_POST
+def comment_delete(request, username, post_id, comment_id):
+    comment = get_object_or_404(
+        Comment.objects.select_related('post'),
+        id=comment_id,
+        post_id=post_id,
+        post__author__username=username
+    )
+    if request.user.id in (comment.author_id, comment.post.author_id):
+        soft_delete_comment(comment)
+    return redirect('post', username, post_id)
@@ -0,0 +1,287 @@
+"""
+Отложенная запись комментариев и подписок.
+
+Представления дописывают операции в файл-журнал и сразу отвечают
+пользователю, а команда flush_writes пачками применяет их к базе.
+Журнал пишется с fsync, поэтому операции переживают перезапуск
+воркера. Операции применяются в порядке записи в журнал, так что
+порядок действий каждого пользователя сохраняется. Одновременно
+работает только один сброс, а операции, которые не удалось
+применить, откладываются в dead.jsonl и не задерживают остальные.
+Тот же сброс создает уведомления о комментариях и подписках
+(см. notifications) и начисляет им очки популярности (см. trending).
+"""
+
+import fcntl
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Comment, Follow, Notification, Post, User
+from . import markup, notifications, trending
+from .mentions import index_mentions
+
+PENDING = 'pending.jsonl'
+DEAD = 'dead.jsonl'
+LOCK = 'spool.lock'
+FLUSH_LOCK = 'flush.lock'
+COMMENT = 'comment'
+FOLLOW = 'follow'
+UNFOLLOW = 'unfollow'
+
+
+def spool_path(name):
+    return os.path.join(settings.WRITE_BEHIND_SPOOL_DIR, name)
+
+
+@contextmanager
+def spool_lock():
+    os.makedirs(settings.WRITE_BEHIND_SPOOL_DIR, exist_ok=True)
+    with open(spool_path(LOCK), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextmanager
+def flush_lock():
+    """Блокировка на весь сброс; None, если идет другой сброс."""
+    os.makedirs(settings.WRITE_BEHIND_SPOOL_DIR, exist_ok=True)
+    with open(spool_path(FLUSH_LOCK), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield None
+            return
+        try:
+            yield lock
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_lines(path, lines):
+    """Дописывает строки в файл с fsync.
+
+    Если прошлая запись оборвалась посреди строки, новые строки
+    начинаются с новой строки и не склеиваются с оборванной.
+    """
+    with open(path, 'a+') as spool:
+        if spool.tell():
+            spool.seek(spool.tell() - 1)
+            if spool.read(1) != '\n':
+                spool.write('\n')
+        spool.writelines(line + '\n' for line in lines)
+        spool.flush()
+        os.fsync(spool.fileno())
+
+
+def enqueue(action, user, **data):
+    """Дописывает операцию пользователя в журнал."""
+    line = json.dumps(
+        dict(data, action=action, user=user.pk),
+        ensure_ascii=False
+    )
+    with spool_lock():
+        append_lines(spool_path(PENDING), [line])
+
+
+def take_batches():
+    """Забирает журнал на обработку.
+
+    Возвращает файлы в порядке записи, включая оставшиеся от
+    прерванного сброса.
+    """
+    with spool_lock():
+        if os.path.exists(spool_path(PENDING)):
+            os.rename(
+                spool_path(PENDING),
+                spool_path(f'processing-{time.time_ns()}.jsonl')
+            )
+        return sorted(
+            spool_path(name)
+            for name in os.listdir(settings.WRITE_BEHIND_SPOOL_DIR)
+            if name.startswith('processing-')
+        )
+
+
+def read_entries(path):
+    """Операции из файла журнала.
+
+    Строки, которые не разбираются (например, оборванная при падении
+    воркера запись), откладываются в dead.jsonl и не останавливают
+    сброс остальных.
+    """
+    entries = []
+    broken = []
+    with open(path) as spool:
+        for line in spool:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                if not isinstance(entry, dict):
+                    raise ValueError('Операция должна быть объектом')
+            except ValueError as error:
+                broken.append(json.dumps(
+                    {'line': line.rstrip('\n'), 'error': repr(error)},
+                    ensure_ascii=False))
+                continue
+            entries.append(entry)
+    if broken:
+        append_lines(spool_path(DEAD), broken)
+    return entries
+
+
+def apply_entries(entries):
+    """Применяет операции одной транзакцией, возвращает их число."""
+    comments = [entry for entry in entries if entry['action'] == COMMENT]
+    post_authors = dict(Post.objects.filter(
+        id__in={entry['post_id'] for entry in comments}
+    ).values_list('id', 'author'))
+    comments = [
+        entry for entry in comments if entry['post_id'] in post_authors
+    ]
+    follows = {}
+    authors = dict(User.objects.filter(username__in={
+        entry['author'] for entry in entries
+        if entry['action'] in (FOLLOW, UNFOLLOW)
+    }).values_list('username', 'id'))
+    for entry in entries:
+        author_id = authors.get(entry.get('author'))
+        if entry['action'] in (FOLLOW, UNFOLLOW) and author_id:
+            follows[entry['user'], author_id] = entry['action'] == FOLLOW
+    with transaction.atomic():
+        index_mentions(create_comments(markup.render_html([
+            Comment(
+                post_id=entry['post_id'],
+                author_id=entry['user'],
+                text=entry['text']
+            )
+            for entry in comments
+        ])))
+        followed = apply_follows(follows)
+        trending.record_comments([entry['post_id'] for entry in comments])
+        trending.record_follows([author for _, author in followed])
+        notifications.deliver([
+            notifications.event(
+                Notification.COMMENT,
+                post_authors[entry['post_id']],
+                entry['user'],
+                entry['post_id']
+            )
+            for entry in comments
+        ] + [
+            notifications.event(Notification.FOLLOW, author, user)
+            for user, author in followed
+        ])
+    return len(entries)
+
+
+def create_comments(comments):
+    """bulk_create комментариев с id даже там, где база их не возвращает.
+
+    Без RETURNING (SQLite) id находятся по автору, посту и тексту среди
+    строк, добавленных после вставки пачки.
+    """
+    if connection.features.can_return_ids_from_bulk_insert or not comments:
+        return Comment.objects.bulk_create(comments)
+    last = Comment.all_objects.aggregate(last=Max('pk'))['last'] or 0
+    Comment.objects.bulk_create(comments)
+    ids = defaultdict(deque)
+    for pk, author, post, text in Comment.all_objects.filter(
+        pk__gt=last
+    ).order_by('pk').values_list('pk', 'author', 'post', 'text'):
+        ids[author, post, text].append(pk)
+    for comment in comments:
+        comment.pk = ids[
+            comment.author_id, comment.post_id, comment.text].popleft()
+    return comments
+
+
+def apply_follows(follows):
+    """Приводит подписки к итоговому состоянию после всех операций.
+
+    Возвращает пары (подписчик, автор) созданных подписок.
+    """
+    if not follows:
+        return []
+    users = {user for user, _ in follows}
+    existing = set(Follow.objects.filter(user__in=users).values_list(
+        'user', 'author'))
+    created = [
+        (user, author) for (user, author), followed in follows.items()
+        if followed and user != author and (user, author) not in existing
+    ]
+    Follow.objects.bulk_create([
+        Follow(user_id=user, author_id=author) for user, author in created
+    ])
+    for user in users:
+        unfollowed = [
+            author for (follower, author), followed in follows.items()
+            if follower == user and not followed
+        ]
+        if unfollowed:
+            Follow.objects.filter(user=user, author__in=unfollowed).delete()
+    return created
+
+
+def save_remaining(path, entries):
+    """Атомарно заменяет файл журнала необработанным остатком."""
+    with open(path + '.tmp', 'w') as spool:
+        for entry in entries:
+            spool.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        spool.flush()
+        os.fsync(spool.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def apply_batch(entries):
+    """Применяет пачку, возвращает число примененных операций.
+
+    Если пачка не применяется целиком, операции применяются по одной,
+    а ошибочные дописываются в dead.jsonl вместе с текстом ошибки.
+    """
+    try:
+        return apply_entries(entries)
+    except Exception:
+        pass
+    applied = 0
+    dead = []
+    for entry in entries:
+        try:
+            applied += apply_entries([entry])
+        except Exception as error:
+            dead.append(json.dumps(
+                dict(entry, error=repr(error)), ensure_ascii=False))
+    if dead:
+        append_lines(spool_path(DEAD), dead)
+    return applied
+
+
+def flush(batch_size=1000):
+    """Сбрасывает журнал в базу, возвращает число операций.
+
+    После каждой пачки файл журнала укорачивается, поэтому при сбое
+    повторно применится не больше одной пачки. Если журнал уже
+    сбрасывает другой процесс, ничего не делает.
+    """
+    flushed = 0
+    with flush_lock() as lock:
+        if lock is None:
+            return 0
+        for path in take_batches():
+            entries = read_entries(path)
+            while entries:
+                flushed += apply_batch(entries[:batch_size])
+                entries = entries[batch_size:]
+                save_remaining(path, entries)
+            os.remove(path)
+    return flushed
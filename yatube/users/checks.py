@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+CACHED_SESSION_ENGINES = {
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+}
+PER_PROCESS_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def session_cache_check(app_configs, **kwargs):
+    """Сессии в кэше процесса не разлогинивают пользователя в других
+    воркерах: они продолжают принимать cookie после выхода."""
+    if settings.SESSION_ENGINE not in CACHED_SESSION_ENGINES:
+        return []
+    backend = settings.CACHES.get(
+        settings.SESSION_CACHE_ALIAS, {}).get('BACKEND')
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [Warning(
+        f'SESSION_ENGINE {settings.SESSION_ENGINE} хранит сессии в '
+        f'кэше {backend}, который не общий для воркеров.',
+        hint='Настройте общий кэш (memcached, redis) или используйте '
+             'django.contrib.sessions.backends.db.',
+        id='users.W001',
+    )]
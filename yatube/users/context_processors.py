@@ -0,0 +1,7 @@
+from django.utils.functional import SimpleLazyObject
+
+from .identity import get_identity
+
+
+def identity(request):
+    return {'viewer': SimpleLazyObject(lambda: get_identity(request))}
@@ -0,0 +1,83 @@
+"""
+Легкая личность пользователя для шаблонов.
+
+При входе id, username и полное имя пользователя сохраняются в сессии.
+Шаблоны берут их оттуда, не загружая пользователя из базы. Раз в
+IDENTITY_MAX_AGE секунд и при смене хеша сессии личность сверяется
+с request.user: Django проверяет хеш пароля и is_active, так что после
+смены пароля или блокировки сессия перестает считаться входом.
+Решения о доступе принимаются по request.user, а не по личности.
+"""
+
+import time
+
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+IDENTITY_SESSION_KEY = 'identity'
+IDENTITY_MAX_AGE = 60
+
+
+class Identity:
+    def __init__(self, pk=None, username='', full_name=''):
+        self.pk = self.id = pk
+        self.username = username
+        self.full_name = full_name
+
+    @property
+    def is_authenticated(self):
+        return self.pk is not None
+
+    def get_full_name(self):
+        return self.full_name
+
+    def __str__(self):
+        return self.username
+
+
+def identity_data(user):
+    return {
+        'pk': user.pk,
+        'username': user.username,
+        'full_name': user.get_full_name(),
+    }
+
+
+def store(session, user):
+    session[IDENTITY_SESSION_KEY] = dict(
+        identity_data(user),
+        hash=session.get(HASH_SESSION_KEY),
+        checked=time.time()
+    )
+    return identity_data(user)
+
+
+def is_fresh(session, data):
+    return (
+        data is not None
+        and data.get('hash') == session.get(HASH_SESSION_KEY)
+        and time.time() - data.get('checked', 0) < IDENTITY_MAX_AGE
+    )
+
+
+@receiver(user_logged_in)
+def store_identity(sender, request, user, **kwargs):
+    store(request.session, user)
+
+
+def get_identity(request):
+    """Личность текущего пользователя, обычно без запроса к users."""
+    if not hasattr(request, '_identity'):
+        session = request.session
+        data = session.get(IDENTITY_SESSION_KEY)
+        if SESSION_KEY not in session:
+            request._identity = Identity()
+        elif is_fresh(session, data):
+            request._identity = Identity(
+                data['pk'], data['username'], data['full_name'])
+        elif request.user.is_authenticated:
+            request._identity = Identity(**store(session, request.user))
+        else:
+            request._identity = Identity()
+    return request._identity
@@ -0,0 +1,25 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истекшие сессии пачками, не блокируя таблицу надолго.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = Session.objects.filter(
+            expire_date__lt=timezone.now()
+        ).values_list('session_key', flat=True)
+        deleted = 0
+        while True:
+            batch = list(expired[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                deleted += Session.objects.filter(
+                    session_key__in=batch).delete()[0]
+        self.stdout.write(f'Удалено сессий: {deleted}')
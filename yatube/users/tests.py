@@ -1,2 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from users import identity
+from users.checks import session_cache_check
+
+INDEX = reverse('index')
+User = get_user_model()
+
+
+class SessionsTest(TestCase):
+    def assertNoSessionQueries(self, client):
+        with CaptureQueriesContext(connection) as context:
+            client.get(INDEX)
+        self.assertFalse([
+            query for query in context.captured_queries
+            if 'django_session' in query['sql']
+        ])
+
+    def test_guest_does_not_touch_sessions(self):
+        """Запросы гостя не обращаются к таблице сессий."""
+        self.assertNoSessionQueries(self.client)
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_user_session_is_read_from_cache(self):
+        """Сессия пользователя читается из кэша, а не из базы."""
+        self.client.force_login(User.objects.create_user(username='user'))
+        self.assertNoSessionQueries(self.client)
+
+    def test_clear_sessions_removes_expired(self):
+        """Команда удаляет только истекшие сессии."""
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(
+                session_key=f'expired{index}',
+                session_data='',
+                expire_date=now - timedelta(days=1)
+            )
+        Session.objects.create(
+            session_key='active',
+            session_data='',
+            expire_date=now + timedelta(days=1)
+        )
+        call_command('clear_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['active']
+        )
+
+    def test_cached_sessions_need_shared_cache(self):
+        """Сессии в кэше одного процесса дают предупреждение."""
+        engine = 'django.contrib.sessions.backends.cached_db'
+        with self.settings(SESSION_ENGINE=engine):
+            self.assertEqual(
+                [error.id for error in session_cache_check(None)],
+                ['users.W001']
+            )
+        with self.settings(SESSION_ENGINE=engine, CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.memcached.'
+                           'MemcachedCache'}}):
+            self.assertEqual(session_cache_check(None), [])
+        self.assertEqual(session_cache_check(None), [])
+
+
+class IdentityTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='user', first_name='Мария', last_name='Иванова')
+
+    def test_pages_do_not_load_user(self):
+        """Страницы показывают пользователя без запроса к auth_user."""
+        self.client.force_login(self.user)
+        for url in [INDEX, reverse('groups'), reverse('trending')]:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertContains(response, 'Мария Иванова')
+                self.assertFalse([
+                    query for query in context.captured_queries
+                    if f'"auth_user"."id" = {self.user.pk}' in query['sql']
+                ])
+
+    def test_identity_for_guest(self):
+        """Гость видит ссылки входа и регистрации."""
+        response = self.client.get(INDEX)
+        self.assertFalse(response.context['viewer'].is_authenticated)
+        self.assertContains(response, reverse('signup'))
+
+    def test_password_change_ends_identity(self):
+        """После смены пароля сессия не дает доступа и личности."""
+        user = User.objects.create_user(username='other', password='old')
+        self.client.force_login(user)
+        follow_api = reverse('api_follow_posts')
+        self.assertEqual(self.client.get(follow_api).status_code, 200)
+        user.set_password('new')
+        user.save()
+        self.assertEqual(self.client.get(follow_api).status_code, 401)
+        self.assertFalse(
+            self.client.get(INDEX).context['viewer'].is_authenticated)
+
+    def test_banned_user_loses_identity_after_recheck(self):
+        """Заблокированный пользователь теряет личность при сверке."""
+        user = User.objects.create_user(username='banned')
+        self.client.force_login(user)
+        self.assertTrue(
+            self.client.get(INDEX).context['viewer'].is_authenticated)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        with mock.patch.object(identity, 'IDENTITY_MAX_AGE', 0):
+            response = self.client.get(INDEX)
+        self.assertFalse(response.context['viewer'].is_authenticated)
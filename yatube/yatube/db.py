@@ -0,0 +1,159 @@
+"""
+Постоянные соединения с базой данных.
+
+Django держит одно соединение на поток воркера и переиспользует его
+CONN_MAX_AGE секунд, поэтому размер пула равен числу потоков воркера.
+ConnectionMiddleware проверяет переиспользуемое соединение перед
+запросом и собирает метрики выдачи соединений. ReplicaRouter и
+ReplicaMiddleware распределяют чтение по репликам из DATABASE_REPLICAS.
+На реплики идет только чтение безопасных запросов, которые ничего не
+пишут; команды, задачи и пишущие запросы читают из основной базы,
+чтобы не принимать решения о записи по отстающей реплике.
+"""
+
+import random
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+METRICS = {
+    'requests': 0,
+    'reused': 0,
+    'opened': 0,
+    'health_check_failures': 0,
+}
+
+_metrics_lock = threading.Lock()
+
+
+def record(**counters):
+    with _metrics_lock:
+        for name, value in counters.items():
+            METRICS[name] += value
+
+
+def metrics():
+    """Снимок счетчиков выдачи соединений."""
+    with _metrics_lock:
+        return dict(METRICS)
+
+
+def check_connection(connection):
+    """Проверяет соединение, оставшееся от прошлого запроса.
+
+    Возвращает True, если соединение можно использовать повторно.
+    Соединения старше CONN_MAX_AGE Django закрывает сам; с
+    CONN_HEALTH_CHECKS сломанное соединение закрывается здесь, и Django
+    откроет новое при первом запросе к базе.
+    """
+    if connection.connection is None:
+        return False
+    if (connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not connection.is_usable()):
+        connection.close()
+        record(health_check_failures=1)
+        return False
+    return True
+
+
+class ConnectionMiddleware:
+    """Проверяет постоянные соединения и считает их переиспользование."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reused = {
+            connection.alias: check_connection(connection)
+            for connection in connections.all()
+        }
+        response = self.get_response(request)
+        opened = sum(
+            1 for connection in connections.all()
+            if connection.connection is not None
+            and not reused[connection.alias]
+        )
+        record(requests=1, reused=sum(reused.values()), opened=opened)
+        return response
+
+
+_routing = threading.local()
+
+PRIMARY_COOKIE = 'use_primary_db'
+
+# Представления, которые пишут в базу даже на GET-запрос.
+WRITE_VIEWS = {
+    'new_post',
+    'post_edit',
+    'add_comment',
+    'profile_follow',
+    'profile_unfollow',
+    'signup',
+    'notifications',
+}
+
+
+def use_primary():
+    return getattr(_routing, 'use_primary', True)
+
+
+def pin_to_primary(pinned=True):
+    _routing.use_primary = pinned
+
+
+class ReplicaRouter:
+    """Отправляет чтение на реплики, а запись — в основную базу.
+
+    По умолчанию чтение тоже идет в основную базу; на реплики его
+    отпускает только ReplicaMiddleware для безопасных запросов без
+    недавней записи пользователя.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or use_primary():
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaMiddleware:
+    """Закрепляет за основной базой записи и чтения сразу после них.
+
+    После записи пользователь получает cookie на
+    REPLICA_STICKY_SECONDS секунд, чтобы видеть свои изменения, пока
+    реплики догоняют основную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.db_write = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        pin_to_primary(request.db_write or PRIMARY_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            pin_to_primary()
+        if request.db_write and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.url_name in WRITE_VIEWS:
+            request.db_write = True
+            pin_to_primary()
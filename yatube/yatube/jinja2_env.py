@@ -0,0 +1,69 @@
+"""
+Окружение Jinja2 для ленты и страницы поста.
+
+Повторяет теги и фильтры, которые используют шаблоны Django: url,
+static, thumbnail, cache, addclass, linebreaksbr и date.
+"""
+
+import logging
+
+from django.core.cache import cache as fragment_cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.defaultfilters import date, linebreaksbr
+from django.templatetags.static import static
+from django.urls import reverse
+from jinja2 import Environment
+from markupsafe import Markup
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.conf import settings as sorl_settings
+
+from users.templatetags.user_filters import addclass
+
+logger = logging.getLogger('sorl.thumbnail')
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args, kwargs=kwargs)
+
+
+def thumbnail(file_, geometry, **options):
+    """Миниатюра картинки или None, если картинки нет.
+
+    Как и тег {% thumbnail %}, при THUMBNAIL_DEBUG=False не пропускает
+    ошибки битой или пропавшей картинки, а пишет их в лог.
+    """
+    if not file_:
+        return None
+    try:
+        return get_thumbnail(file_, geometry, **options)
+    except Exception:
+        if sorl_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Thumbnail failed')
+        return None
+
+
+def cache(timeout, name, *vary_on, caller):
+    """Кэширует фрагмент: {% call cache(20, 'name', page) %}."""
+    key = make_template_fragment_key(f'jinja2.{name}', vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'thumbnail': thumbnail,
+        'cache': cache,
+    })
+    env.filters.update({
+        'addclass': addclass,
+        'linebreaksbr': linebreaksbr,
+        'date': date,
+    })
+    return env
@@ -0,0 +1,153 @@
+"""
+Ограничение частоты запросов к пишущим представлениям.
+
+Для каждого имени URL из RATELIMITS ведутся счетчики запросов в
+фиксированных окнах: на пользователя и на IP-адрес клиента. Счетчики
+хранятся в общем кэше и увеличиваются атомарными add и incr, поэтому
+лимит общий для всех воркеров. Если кэш недоступен, используются
+счетчики в памяти процесса.
+"""
+
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_MAX_KEYS = 10000
+
+REJECTED = {}
+
+_lock = threading.Lock()
+_local_counters = {}
+
+
+def parse_rate(rate):
+    """'30/h' -> (30, 3600)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def rejected():
+    """Снимок числа отклоненных запросов по именам URL."""
+    with _lock:
+        return dict(REJECTED)
+
+
+def window_key(key, period, now):
+    return f'{key}:{int(now // period)}'
+
+
+def local_counts(keys, now):
+    with _lock:
+        return {
+            key: _local_counters[key][1] for key in keys
+            if key in _local_counters and _local_counters[key][0] > now
+        }
+
+
+def local_incr(key, expires, now):
+    """Счетчик в памяти процесса; число ключей ограничено."""
+    with _lock:
+        if key not in _local_counters and (
+                len(_local_counters) >= LOCAL_MAX_KEYS):
+            for stale in [
+                name for name, (until, _) in _local_counters.items()
+                if until <= now
+            ]:
+                del _local_counters[stale]
+            if len(_local_counters) >= LOCAL_MAX_KEYS:
+                del _local_counters[next(iter(_local_counters))]
+        until, count = _local_counters.get(key, (expires, 0))
+        _local_counters[key] = until, count + 1
+        return count + 1
+
+
+def get_counts(keys, now):
+    try:
+        return cache.get_many(keys)
+    except Exception:
+        return local_counts(keys, now)
+
+
+def incr(key, period, now):
+    try:
+        cache.add(key, 0, period)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, period)
+            return 1
+    except Exception:
+        return local_incr(key, (now // period + 1) * period, now)
+
+
+def take_tokens(keys, capacity, period):
+    """Засчитывает запрос во все счетчики клиента.
+
+    Возвращает 0, если запрос разрешен, иначе число секунд до начала
+    следующего окна. Если один из счетчиков уже исчерпан, остальные
+    не увеличиваются.
+    """
+    now = time.time()
+    keys = [window_key(key, period, now) for key in keys]
+    retry_after = max(1, math.ceil((now // period + 1) * period - now))
+    counts = get_counts(keys, now)
+    if any(counts.get(key, 0) >= capacity for key in keys):
+        return retry_after
+    if max(incr(key, period, now) for key in keys) > capacity:
+        return retry_after
+    return 0
+
+
+def client_ip(request):
+    """Адрес клиента из заголовка доверенного прокси или REMOTE_ADDR.
+
+    В X-Forwarded-For берется последний адрес — тот, что дописал
+    доверенный прокси.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def client_keys(request):
+    keys = [f'ip:{client_ip(request)}']
+    if request.user.is_authenticated:
+        keys.append(f'user:{request.user.pk}')
+    return keys
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 с Retry-After, когда лимит клиента исчерпан."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name = request.resolver_match.url_name
+        if not settings.RATELIMIT_ENABLED or name not in settings.RATELIMITS:
+            return None
+        rate, methods = settings.RATELIMITS[name]
+        if request.method not in methods:
+            return None
+        capacity, period = parse_rate(rate)
+        retry_after = take_tokens(
+            [f'ratelimit:{name}:{key}' for key in client_keys(request)],
+            capacity, period
+        )
+        if not retry_after:
+            return None
+        with _lock:
+            REJECTED[name] = REJECTED.get(name, 0) + 1
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже.', status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
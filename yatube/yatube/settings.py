@@ -58,11 +58,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.db.ConnectionMiddleware',
+    'yatube.db.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.ratelimit.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -80,18 +83,32 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
+        # With DEBUG off Django wraps these loaders in the cached loader.
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
+                'users.context_processors.identity',
+                'posts.context_processors.notifications',
+                'posts.context_processors.events',
                 'django.contrib.messages.context_processors.messages',
             ],
         },
     },
+    {
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'OPTIONS': {
+            'environment': 'yatube.jinja2_env.environment',
+        },
+    },
 ]
 
+# Templates rendered by the Jinja2 engine, e.g. "index.html,post.html".
+JINJA2_TEMPLATES = set(filter(None, os.getenv('JINJA2_TEMPLATES', '').split(',')))
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -105,10 +122,36 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Persistent connections: one per worker thread, reused between
+        # requests. The number of worker threads is the pool size, and
+        # CONN_MAX_AGE is the only lifetime limit: Django closes older
+        # connections at the end of a request.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Opt-in: yatube.db.ConnectionMiddleware runs a `SELECT 1` on the
+        # reused connection before each request.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', '0') == '1',
     }
 }
 
+# Read replicas: comma separated hosts in DB_REPLICA_HOSTS, each one gets
+# a replicaN alias with the credentials of the default database.
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = dict(
+        DATABASES['default'],
+        HOST=host.strip(),
+        TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['yatube.db.ReplicaRouter']
+
+# Reads of a user who has just written go to the primary for this long.
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -166,6 +209,70 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Absolute links in emails sent outside a request, e.g. `send_digests`.
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+# Sessions live in the database by default. With a shared cache backend
+# in CACHES set SESSION_ENGINE=django.contrib.sessions.backends.cached_db
+# to read them from the cache; with the per-process LocMemCache a logout
+# would only evict the session in one worker (see check users.W001).
+# Requests without a session cookie (anonymous feed traffic) never touch
+# the session store.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+
+# Fixed-window counters per user and per IP, kept in the default cache:
+# url name -> (rate, limited methods). Use a shared cache backend
+# (memcached, redis) so that all workers count against one limit.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', '1') == '1'
+
+# META key of the client address set by the trusted reverse proxy, e.g.
+# HTTP_X_REAL_IP or HTTP_X_FORWARDED_FOR (its last address is used).
+# Without it every client behind the proxy shares REMOTE_ADDR.
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER') or None
+
+RATELIMITS = {
+    'new_post': ('30/h', ('POST',)),
+    'add_comment': ('120/h', ('POST',)),
+    'post_like': ('600/h', ('POST',)),
+    'profile_follow': ('200/h', ('GET', 'POST')),
+    'signup': ('10/h', ('POST',)),
+}
+
+# Server-Sent Events about new posts, off by default. On WSGI every open
+# stream holds a worker thread for up to SSE_MAX_SECONDS, so route
+# /events/ to a separate process with async workers (e.g. gunicorn -k
+# gevent) before enabling it. InProcessBroker only reaches streams in the
+# process that saved the post; with a separate events process set
+# PUBSUB_BROKER=posts.pubsub.DatabaseBroker, which polls the posts table.
+SSE_ENABLED = os.getenv('SSE_ENABLED', '0') == '1'
+
+PUBSUB_BROKER = os.getenv('PUBSUB_BROKER', 'posts.pubsub.InProcessBroker')
+
+SSE_MAX_SECONDS = int(os.getenv('SSE_MAX_SECONDS', 300))
+
+# Write-behind for comments and follows, flushed by `manage.py flush_writes`.
+# With it off, comments and follows are written right away.
+WRITE_BEHIND = os.getenv('WRITE_BEHIND', '0') == '1'
+
+# Notifications are queued by the views and delivered in batches by
+# `manage.py flush_writes`, so run it from cron or with --interval either
+# way. NOTIFY_INLINE=1 delivers them inside the request instead, at the
+# cost of several extra queries per comment or follow.
+NOTIFY_INLINE = os.getenv('NOTIFY_INLINE', '0') == '1'
+
+WRITE_BEHIND_SPOOL_DIR = os.getenv(
+    'WRITE_BEHIND_SPOOL_DIR', os.path.join(BASE_DIR, 'spool'))
+
+# `manage.py archive_posts` moves posts older than this out of the feeds
+# and purges rows soft-deleted from the UI after the retention period.
+POST_ARCHIVE_DAYS = int(os.getenv('POST_ARCHIVE_DAYS', 365))
+
+DELETED_RETENTION_DAYS = int(os.getenv('DELETED_RETENTION_DAYS', 30))
+
+# Post revisions older than this are removed by `manage.py prune_revisions`.
+REVISION_RETENTION_DAYS = int(os.getenv('REVISION_RETENTION_DAYS', 180))
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -36,6 +36,9 @@ urlpatterns = [
     path(
         'about/',
         include('about.urls', namespace='about')),
+    path(
+        'api/v1/',
+        include('posts.api_urls')),
     path(
         '',
         include('posts.urls')),
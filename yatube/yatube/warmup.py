@@ -0,0 +1,53 @@
+"""
+Прогрев кэша шаблонов.
+
+Компилирует шаблоны проекта и его приложений при старте процесса, чтобы
+первые запросы не тратили время на разбор шаблонов. Шаблоны сторонних
+приложений (admin, debug_toolbar) не трогаются, а ошибка в одном
+шаблоне записывается в лог и не мешает процессу запуститься.
+"""
+
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+
+def project_template_dirs(engine):
+    """Каталоги шаблонов проекта и приложений из BASE_DIR."""
+    base_dir = os.path.join(settings.BASE_DIR, '')
+    return [*engine.dirs, *(
+        os.path.join(app_config.path, 'templates')
+        for app_config in apps.get_app_configs()
+        if app_config.path.startswith(base_dir)
+    )]
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов проекта."""
+    names = set()
+    for directory in project_template_dirs(engine):
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith('.html'):
+                    names.add(os.path.relpath(
+                        os.path.join(root, name), directory))
+    return sorted(names)
+
+
+def warm_templates():
+    """Загружает шаблоны в кэш, возвращает имена загруженных."""
+    engine = engines['django'].engine
+    loaded = []
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except Exception:
+            logger.exception('Не удалось загрузить шаблон %s', name)
+        else:
+            loaded.append(name)
+    return loaded
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if os.getenv('TEMPLATE_WARMUP', '1') == '1':
+    from yatube.warmup import warm_templates
+
+    warm_templates()